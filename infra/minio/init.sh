@@ -14,6 +14,7 @@ done
 echo "Creating buckets..."
 mc mb -p local/mlflow   >/dev/null 2>&1 || true
 mc mb -p local/datasets >/dev/null 2>&1 || true
+mc mb -p local/lake-curated >/dev/null 2>&1 || true
 
 echo "Buckets:"
 mc ls local
\ No newline at end of file
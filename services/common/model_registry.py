@@ -0,0 +1,41 @@
+"""MLflow registry URIs: parsing and version resolution shared by iris_api and iris_batch_score.
+
+``models:/<name>/<version|latest|stage>`` and ``models:/<name>@<alias>`` are the
+only registry forms; everything else (``runs:/``, ``s3://``, local paths) is
+left to the caller. Copied into the service images from ``services/common``.
+"""
+
+import re
+
+class ModelVersionNotFound(RuntimeError):
+    pass
+
+
+REGISTRY_URI_RE = re.compile(r"^models:/(?P<name>[^/@]+)(?:@(?P<alias>[^/]+)|/(?P<ref>[^/]+))$")
+
+
+def parse_registry_uri(model_uri: str) -> tuple[str, str | None, str | None] | None:
+    """``(name, alias, ref)`` of a registry URI, or None for any other URI."""
+    match = REGISTRY_URI_RE.match(model_uri)
+    if match is None:
+        return None
+    return match["name"], match["alias"], match["ref"]
+
+
+def get_model_version(client, name: str, alias: str | None, ref: str | None):
+    """Registry ``ModelVersion`` for an alias, a version number, ``latest`` or a stage."""
+    if alias is not None:
+        return client.get_model_version_by_alias(name, alias)
+    if ref.isdigit():
+        return client.get_model_version(name, ref)
+    if ref == "latest":
+        versions = client.search_model_versions(
+            f"name='{name}'", max_results=1, order_by=["version_number DESC"]
+        )
+        if not versions:
+            raise ModelVersionNotFound(f"Registered model {name!r} has no versions.")
+    else:
+        versions = client.get_latest_versions(name, stages=[ref])
+        if not versions:
+            raise ModelVersionNotFound(f"No version of {name!r} in stage {ref!r}.")
+    return versions[0]
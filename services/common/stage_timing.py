@@ -0,0 +1,211 @@
+"""Named stage timing shared by warehouse_loader, iris_train and iris_api.
+
+Each stage records wall time, process CPU time (including reaped child
+processes), the process peak RSS when the stage ended and, if the caller sets
+it, the number of rows it handled. Timings are emitted as log lines and can be
+written to ``mlops.stage_timings`` or turned into MLflow metrics.
+
+``STAGE_PROFILE`` (``all`` or a comma-separated list of stage names) runs the
+matching stages under cProfile and dumps ``.prof`` plus a cumulative-time
+summary to ``STAGE_PROFILE_DIR``.
+
+Copied into each service image from ``services/common`` (see docker-compose).
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+def cpu_seconds() -> float:
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    job: str
+    stage: str
+    started_at: datetime
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_mb: float
+    rows: int | None = None
+    error: str | None = None
+
+
+class Stage:
+    """Handle yielded by ``StageTimer.stage``; set ``rows`` once the count is known."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.rows: int | None = None
+
+
+class StageTimer:
+    def __init__(
+        self,
+        job: str,
+        emit: Callable[[str], None] = print,
+        profile_stages: set[str] | None = None,
+        profile_dir: str = "/tmp/stage-profiles",
+    ) -> None:
+        self.job = job
+        self.run_id = uuid.uuid4().hex
+        self._emit = emit
+        self._profile_stages = profile_stages or set()
+        self._profile_dir = Path(profile_dir)
+        self._timings: list[StageTiming] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, job: str, emit: Callable[[str], None] = print) -> "StageTimer":
+        profile = os.getenv("STAGE_PROFILE", "")
+        return cls(
+            job,
+            emit=emit,
+            profile_stages={s.strip() for s in profile.split(",") if s.strip()},
+            profile_dir=os.getenv("STAGE_PROFILE_DIR", "/tmp/stage-profiles"),
+        )
+
+    @property
+    def timings(self) -> list[StageTiming]:
+        with self._lock:
+            return list(self._timings)
+
+    def _profiling(self, name: str) -> bool:
+        return "all" in self._profile_stages or name in self._profile_stages
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        handle = Stage(name)
+        handle.rows = rows
+        profiler = cProfile.Profile() if self._profiling(name) else None
+        started_at = datetime.now(timezone.utc)
+        wall_started = time.perf_counter()
+        cpu_started = cpu_seconds()
+        error = None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield handle
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            timing = StageTiming(
+                job=self.job,
+                stage=name,
+                started_at=started_at,
+                wall_seconds=time.perf_counter() - wall_started,
+                cpu_seconds=cpu_seconds() - cpu_started,
+                peak_rss_mb=peak_rss_mb(),
+                rows=handle.rows,
+                error=error,
+            )
+            with self._lock:
+                self._timings.append(timing)
+            self._emit(_format(timing))
+            if profiler is not None:
+                self._dump_profile(name, profiler)
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile) -> None:
+        self._profile_dir.mkdir(parents=True, exist_ok=True)
+        base = self._profile_dir / f"{self.job}.{name}.{self.run_id[:8]}"
+        profiler.dump_stats(f"{base}.prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(30)
+        Path(f"{base}.txt").write_text(summary.getvalue(), encoding="utf-8")
+        self._emit(f"Profile for stage {name} written to {base}.prof")
+
+    def metrics(self) -> dict[str, float]:
+        """Flat ``stage_<name>_*`` metrics; the last run of a repeated stage wins."""
+        metrics: dict[str, float] = {}
+        for t in self.timings:
+            key = f"stage_{t.stage}"
+            metrics[f"{key}_wall_s"] = t.wall_seconds
+            metrics[f"{key}_cpu_s"] = t.cpu_seconds
+            metrics[f"{key}_peak_rss_mb"] = t.peak_rss_mb
+            if t.rows is not None:
+                metrics[f"{key}_rows"] = t.rows
+        return metrics
+
+    def write_to_postgres(self, engine, labels: dict | None = None) -> None:
+        """Append the recorded timings to ``mlops.stage_timings`` in one transaction.
+
+        Failures are reported through ``emit`` only: timings never fail the job.
+        """
+        from sqlalchemy import text
+
+        rows = [
+            {
+                "run_id": self.run_id,
+                "job": t.job,
+                "stage": t.stage,
+                "started_at": t.started_at,
+                "wall_seconds": t.wall_seconds,
+                "cpu_seconds": t.cpu_seconds,
+                "peak_rss_mb": t.peak_rss_mb,
+                "row_count": t.rows,
+                "error": t.error,
+                "labels": json.dumps(labels or {}, default=str),
+            }
+            for t in self.timings
+        ]
+        if not rows:
+            return
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO mlops.stage_timings (
+                          run_id, job, stage, started_at, wall_seconds, cpu_seconds,
+                          peak_rss_mb, row_count, error, labels
+                        )
+                        VALUES (
+                          :run_id, :job, :stage, :started_at, :wall_seconds, :cpu_seconds,
+                          :peak_rss_mb, :row_count, :error, CAST(:labels AS JSONB)
+                        )
+                        """
+                    ),
+                    rows,
+                )
+        except Exception as exc:
+            reason = str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+            self._emit(f"Could not write stage timings to mlops.stage_timings: {reason}")
+
+
+def _format(t: StageTiming) -> str:
+    rows = ""
+    if t.rows is not None:
+        rate = t.rows / t.wall_seconds if t.wall_seconds > 0 else 0.0
+        rows = f" | {t.rows} rows ({rate:.0f} rows/s)"
+    status = f" | failed: {t.error}" if t.error else ""
+    return (
+        f"[stage] {t.job}.{t.stage}: wall {t.wall_seconds:.3f}s, cpu {t.cpu_seconds:.3f}s,"
+        f" peak RSS {t.peak_rss_mb:.1f} MiB{rows}{status}"
+    )
@@ -1,22 +1,185 @@
 """Iris demo API with startup model selection via MODEL_URI."""
 
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+
 from fastapi import HTTPException
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
-from model_loader import LoadedModel, load_model, run_prediction
-from predictor import IRIS_FEATURE_COLUMNS, build_features_frame
-from schemas import ModelInfoResponse, PredictRequest, PredictResponse
+from batching import PredictionBatcher
+from bulk import encode_error, encode_predictions, iter_feature_chunks, resolve_bulk_format
+from inference import InferenceExecutor, InferenceSaturated
+from metrics import (
+    CONTENT_TYPE,
+    ERRORS,
+    RECORDS_PER_REQUEST,
+    REGISTRY,
+    STAGE_SECONDS,
+    Gauge,
+    MetricsMiddleware,
+    in_flight,
+)
+from model_loader import LoadedModel, run_prediction
+from multi_model import ModelPool, UnknownModel, UnknownModelVersion, build_records_array
+from prediction_cache import PredictionCache, canonical_rows
+from predictor import IRIS_FEATURE_COLUMNS, build_features_array
+from reloader import ModelReference, ModelReloader, load_reference, resolve_startup_reference
+from schemas import (
+    LoadedModelInfo,
+    ModelInfoResponse,
+    ModelPredictRequest,
+    PredictionCacheStatsResponse,
+    PredictRequest,
+    PredictResponse,
+    ServedModelInfo,
+)
 from settings import load_settings
+try:
+    from stage_timing import StageTimer
+except ModuleNotFoundError:
+    # Images copy stage_timing.py next to the service; local runs use services/common.
+    sys.path.append(str(Path(__file__).resolve().parent.parent / "common"))
+    from stage_timing import StageTimer
+
 
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 app = FastAPI(title="Iris Demo API", version="0.1.0")
+app.add_middleware(MetricsMiddleware)
+
+
+def _predict_with_current_model(features):
+    return run_prediction(app.state.loaded_model, features)
 
 
 @app.on_event("startup")
 def startup() -> None:
     settings = load_settings()
-    loaded_model = load_model(settings)
-    app.state.loaded_model = loaded_model
+    app.state.settings = settings
+    # Startup stages are logged only; the API has no warehouse connection.
+    timer = StageTimer.from_env("iris_api", emit=logging.getLogger("iris_api.stages").info)
+    app.state.stage_timer = timer
+    with timer.stage("resolve_model_reference"):
+        reference = resolve_startup_reference(settings)
+    with timer.stage("load_model"):
+        app.state.loaded_model = load_reference(settings, reference)
+
+    models = ModelPool.from_settings(settings) if settings.served_datasets else None
+    app.state.models = models
+
+    with timer.stage("start_inference_executor"):
+        inference = InferenceExecutor(
+            kind=settings.inference_executor,
+            max_workers=settings.inference_workers,
+            max_pending=settings.inference_max_pending,
+            settings=replace(settings, model_uri=reference.model_uri),
+            predict_fn=_predict_with_current_model,
+            predict_named_fn=models.predict if models is not None else None,
+        )
+    app.state.inference = inference
+
+    prediction_cache = None
+    if settings.prediction_cache_enabled:
+        prediction_cache = PredictionCache(
+            max_entries=settings.prediction_cache_max_entries,
+            ttl_s=settings.prediction_cache_ttl_s,
+        )
+    app.state.prediction_cache = prediction_cache
+
+    def swap_model(loaded_model: LoadedModel, new_reference: ModelReference) -> None:
+        inference.reload(replace(settings, model_uri=new_reference.model_uri))
+        app.state.loaded_model = loaded_model
+        if prediction_cache is not None:
+            prediction_cache.clear()
+
+    reloader = ModelReloader(settings, current=reference, on_swap=swap_model)
+    reloader.start()
+    app.state.reloader = reloader
+
+    app.state.batcher = None
+    if settings.batching_enabled:
+        # Coalesced batches are scored on the inference pool, one in flight per worker.
+        batcher = PredictionBatcher(
+            inference.submit,
+            max_batch_records=settings.batch_max_records,
+            max_wait_ms=settings.batch_max_wait_ms,
+            max_in_flight=settings.inference_workers,
+        )
+        batcher.start()
+        app.state.batcher = batcher
+
+    _register_gauges()
+
+
+def _register_gauges() -> None:
+    def model_load_seconds() -> dict:
+        loaded = [app.state.loaded_model]
+        if app.state.models is not None:
+            loaded.extend(app.state.models.loaded())
+        return {(m.model_uri or "dummy", m.version or ""): m.load_seconds for m in loaded}
+
+    def cache_stats():
+        cache: PredictionCache | None = app.state.prediction_cache
+        return cache.stats() if cache is not None else None
+
+    REGISTRY.register(
+        Gauge(
+            "iris_api_in_flight_requests",
+            "HTTP requests in progress.",
+            lambda: {(): in_flight()},
+        )
+    )
+    REGISTRY.register(
+        Gauge(
+            "iris_api_inference_pending",
+            "Requests admitted to the inference pool and not finished.",
+            lambda: {(): app.state.inference.pending},
+        )
+    )
+    REGISTRY.register(
+        Gauge(
+            "iris_api_model_load_seconds",
+            "Time taken to load each loaded model.",
+            model_load_seconds,
+            labelnames=("model_uri", "version"),
+        )
+    )
+    for name, field, kind in (
+        ("hits_total", "hits", "counter"),
+        ("misses_total", "misses", "counter"),
+        ("entries", "entries", "gauge"),
+        ("hit_rate", "hit_rate", "gauge"),
+    ):
+        REGISTRY.register(
+            Gauge(
+                f"iris_api_prediction_cache_{name}",
+                f"Prediction cache {field.replace('_', ' ')}.",
+                lambda field=field: (
+                    {(): getattr(stats, field)} if (stats := cache_stats()) is not None else {}
+                ),
+                kind=kind,
+            )
+        )
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    reloader: ModelReloader | None = getattr(app.state, "reloader", None)
+    if reloader is not None:
+        reloader.stop()
+    batcher: PredictionBatcher | None = getattr(app.state, "batcher", None)
+    if batcher is not None:
+        batcher.stop()
+    inference: InferenceExecutor | None = getattr(app.state, "inference", None)
+    if inference is not None:
+        inference.shutdown()
 
 
 @app.get("/")
@@ -36,6 +199,9 @@ def model_info() -> ModelInfoResponse:
         model_backend=loaded_model.backend,
         model_loaded=True,
         model_uri=loaded_model.model_uri,
+        model_version=loaded_model.version,
+        loaded_at=loaded_model.loaded_at,
+        load_seconds=loaded_model.load_seconds,
         feature_columns=IRIS_FEATURE_COLUMNS,
         note=(
             "Dummy predictor currently returns class 0 for every record."
@@ -45,13 +211,222 @@ def model_info() -> ModelInfoResponse:
     )
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(payload: PredictRequest) -> PredictResponse:
+@app.get("/metrics")
+def metrics() -> Response:
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/prediction-cache", response_model=PredictionCacheStatsResponse)
+def prediction_cache_stats() -> PredictionCacheStatsResponse:
+    prediction_cache: PredictionCache | None = app.state.prediction_cache
+    if prediction_cache is None:
+        return PredictionCacheStatsResponse(enabled=False)
+    stats = prediction_cache.stats()
+    return PredictionCacheStatsResponse(
+        enabled=True,
+        hits=stats.hits,
+        misses=stats.misses,
+        hit_rate=stats.hit_rate,
+        entries=stats.entries,
+        max_entries=stats.max_entries,
+    )
+
+
+async def _score(features) -> list:
+    inference: InferenceExecutor = app.state.inference
+    batcher: PredictionBatcher | None = app.state.batcher
+    submit = partial(batcher.submit if batcher is not None else inference.submit, features)
+    return await inference.run(submit)
+
+
+async def _score_with_cache(prediction_cache: PredictionCache, features) -> list:
     loaded_model: LoadedModel = app.state.loaded_model
-    features_df = build_features_frame(payload.records)
+    model_key = (loaded_model.model_uri, loaded_model.version)
+    rows = canonical_rows(features)
+    predictions, misses = prediction_cache.lookup(model_key, rows)
+    if not misses:
+        return predictions
+
+    miss_predictions = await _score(features[misses])
+    prediction_cache.store(model_key, [rows[i] for i in misses], miss_predictions)
+    for i, prediction in zip(misses, miss_predictions):
+        predictions[i] = prediction
+    return predictions
+
+
+def _prediction_error(route: str, exc: Exception) -> HTTPException:
+    if isinstance(exc, InferenceSaturated):
+        ERRORS.inc(route, "saturated")
+        return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+    ERRORS.inc(route, "prediction_failed")
+    return HTTPException(status_code=500, detail=f"Prediction failed: {exc}")
+
+
+def _predict_response(predictions: list) -> Response:
+    # Serialized here (not by FastAPI) so the serialize stage can be timed.
+    started = time.perf_counter()
+    body = PredictResponse(predictions=predictions).model_dump_json()
+    STAGE_SECONDS.observe(time.perf_counter() - started, "serialize")
+    return Response(body, media_type="application/json")
 
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict(payload: PredictRequest) -> Response:
+    prediction_cache: PredictionCache | None = app.state.prediction_cache
+    started = time.perf_counter()
+    features = build_features_array(payload.records)
+    STAGE_SECONDS.observe(time.perf_counter() - started, "features")
+    RECORDS_PER_REQUEST.observe(len(payload.records), "/predict")
+
+    try:
+        if prediction_cache is not None:
+            predictions = await _score_with_cache(prediction_cache, features)
+        else:
+            predictions = await _score(features)
+    except Exception as exc:
+        raise _prediction_error("/predict", exc) from exc
+    return _predict_response(predictions)
+
+
+@app.post("/predict/bulk")
+async def predict_bulk(request: Request) -> StreamingResponse:
+    """Score an NDJSON, CSV or Arrow IPC body; predictions stream back as NDJSON."""
+    settings = app.state.settings
+    inference: InferenceExecutor = app.state.inference
+    try:
+        fmt = resolve_bulk_format(request.headers.get("content-type"))
+    except ValueError as exc:
+        ERRORS.inc("/predict/bulk", "unsupported_media_type")
+        raise HTTPException(status_code=415, detail=str(exc)) from exc
+
+    async def stream_predictions():
+        features = first
+        rows = 0
+        try:
+            while features is not None:
+                rows += len(features)
+                predictions = await inference.run(partial(inference.submit, features))
+                started = time.perf_counter()
+                encoded = encode_predictions(predictions)
+                STAGE_SECONDS.observe(time.perf_counter() - started, "serialize")
+                yield encoded
+                features = await anext(chunks, None)
+        except Exception as exc:
+            # Headers are already sent, so the failure is reported in-stream.
+            ERRORS.inc("/predict/bulk", "stream_error")
+            yield encode_error(str(exc))
+        finally:
+            body.close()
+            RECORDS_PER_REQUEST.observe(rows, "/predict/bulk")
+
+    # The upload is spooled before responding: while a streaming response is
+    # sent, the ASGI server may consume the request channel for disconnects.
+    body = tempfile.SpooledTemporaryFile(max_size=settings.bulk_spool_max_bytes)
+    try:
+        async for part in request.stream():
+            # Past bulk_spool_max_bytes every write hits the disk; keep it off the event loop.
+            await run_in_threadpool(body.write, part)
+        await run_in_threadpool(body.seek, 0)
+
+        chunks = iterate_in_threadpool(
+            iter_feature_chunks(body, fmt, IRIS_FEATURE_COLUMNS, settings.bulk_chunk_rows)
+        )
+        try:
+            first = await anext(chunks, None)
+        except ValueError as exc:
+            ERRORS.inc("/predict/bulk", "invalid_input")
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        # Once handed to the response, the generator owns the body and closes it.
+        return StreamingResponse(stream_predictions(), media_type="application/x-ndjson")
+    except BaseException:
+        body.close()
+        raise
+
+
+def _model_pool() -> ModelPool:
+    models: ModelPool | None = app.state.models
+    if models is None:
+        raise HTTPException(status_code=404, detail="Multi-model serving is disabled.")
+    return models
+
+
+def _served_model_info(models: ModelPool, name: str) -> ServedModelInfo:
     try:
-        predictions = run_prediction(loaded_model, features_df)
+        spec = models.spec(name)
+    except UnknownModel as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}") from exc
+    prefix = f"models:/{name}/"
+    return ServedModelInfo(
+        name=spec.name,
+        dataset_name=spec.dataset_name,
+        default_ref=spec.default_ref,
+        feature_columns=spec.feature_columns,
+        loaded=[
+            LoadedModelInfo(
+                model_uri=m.model_uri,
+                model_version=m.version,
+                loaded_at=m.loaded_at,
+                load_seconds=m.load_seconds,
+                size_bytes=m.size_bytes,
+            )
+            for m in models.loaded()
+            if m.model_uri and m.model_uri.startswith(prefix)
+        ],
+    )
+
+
+@app.get("/models", response_model=list[ServedModelInfo])
+def list_models() -> list[ServedModelInfo]:
+    models = _model_pool()
+    return [_served_model_info(models, name) for name in models.specs]
+
+
+@app.get("/models/{model_name}", response_model=ServedModelInfo)
+def served_model_info(model_name: str) -> ServedModelInfo:
+    return _served_model_info(_model_pool(), model_name)
+
+
+async def _predict_named(model_name: str, ref: str | None, payload: ModelPredictRequest):
+    models = _model_pool()
+    inference: InferenceExecutor = app.state.inference
+    try:
+        spec = models.spec(model_name)
+    except UnknownModel as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {model_name}") from exc
+    route = (
+        "/models/{model_name}/predict"
+        if ref is None
+        else "/models/{model_name}/versions/{version}/predict"
+    )
+    started = time.perf_counter()
+    try:
+        features = build_records_array(payload.records, spec.feature_columns)
+    except ValueError as exc:
+        ERRORS.inc(route, "invalid_input")
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    STAGE_SECONDS.observe(time.perf_counter() - started, "features")
+    RECORDS_PER_REQUEST.observe(len(payload.records), route)
+
+    try:
+        predictions = await inference.run(
+            partial(inference.submit_named, model_name, ref, features)
+        )
+    except UnknownModelVersion as exc:
+        ERRORS.inc(route, "unknown_version")
+        detail = f"Unknown version {ref or spec.default_ref!r} of model {model_name}"
+        raise HTTPException(status_code=404, detail=detail) from exc
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {exc}") from exc
-    return PredictResponse(predictions=predictions)
+        raise _prediction_error(route, exc) from exc
+    return _predict_response(predictions)
+
+
+@app.post("/models/{model_name}/predict", response_model=PredictResponse)
+async def predict_model(model_name: str, payload: ModelPredictRequest) -> Response:
+    return await _predict_named(model_name, None, payload)
+
+
+@app.post("/models/{model_name}/versions/{version}/predict", response_model=PredictResponse)
+async def predict_model_version(
+    model_name: str, version: str, payload: ModelPredictRequest
+) -> Response:
+    return await _predict_named(model_name, version, payload)
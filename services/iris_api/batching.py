@@ -0,0 +1,129 @@
+"""Dynamic micro-batching for /predict.
+
+Concurrent requests are queued, coalesced into one feature frame of up to
+``max_batch_records`` rows (or whatever arrived within ``max_wait_ms``), scored
+with a single model call and split back per request. Batches are handed to
+``submit_fn`` without waiting for the result, so up to ``max_in_flight`` of them
+run at once; results are split back from the future's done-callback.
+"""
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+Features = pd.DataFrame | np.ndarray
+SubmitFn = Callable[[Features], Future]
+
+
+@dataclass
+class _PendingRequest:
+    features: Features
+    future: Future = field(default_factory=Future)
+
+
+class PredictionBatcher:
+    def __init__(
+        self,
+        submit_fn: SubmitFn,
+        max_batch_records: int,
+        max_wait_ms: float,
+        max_in_flight: int,
+    ) -> None:
+        self._submit_fn = submit_fn
+        self._max_batch_records = max_batch_records
+        self._max_wait_s = max_wait_ms / 1000
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._queue: queue.Queue[_PendingRequest | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="predict-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, features: Features) -> Future:
+        if self._thread is None:
+            raise RuntimeError("PredictionBatcher is not running.")
+        pending = _PendingRequest(features=features)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, features: Features) -> list:
+        return self.submit(features).result()
+
+    def _collect(self, first: _PendingRequest) -> tuple[list[_PendingRequest], bool]:
+        batch = [first]
+        n_records = len(first.features)
+        deadline = time.monotonic() + self._max_wait_s
+        while n_records < self._max_batch_records:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            n_records += len(item.features)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: list[_PendingRequest]) -> None:
+        if len(batch) == 1:
+            features = batch[0].features
+        elif isinstance(batch[0].features, np.ndarray):
+            features = np.concatenate([p.features for p in batch])
+        else:
+            features = pd.concat([p.features for p in batch], ignore_index=True)
+
+        # Blocks only while max_in_flight batches are still being scored.
+        self._in_flight.acquire()
+        try:
+            future = self._submit_fn(features)
+        except Exception as exc:
+            self._in_flight.release()
+            for pending in batch:
+                pending.future.set_exception(exc)
+            return
+        future.add_done_callback(partial(self._complete, batch))
+
+    def _complete(self, batch: list[_PendingRequest], future: Future) -> None:
+        self._in_flight.release()
+        try:
+            predictions = future.result()
+        except Exception as exc:
+            for pending in batch:
+                pending.future.set_exception(exc)
+            return
+
+        offset = 0
+        for pending in batch:
+            size = len(pending.features)
+            pending.future.set_result(predictions[offset : offset + size])
+            offset += size
@@ -0,0 +1,115 @@
+"""Latency benchmark: pandas/pyfunc prediction path vs. the native NumPy fast path.
+
+Trains a LogisticRegression on the Iris data locally (no MLflow server needed).
+When mlflow is installed, the "current" path goes through a real pyfunc
+wrapper, as in production; otherwise it calls the estimator on a DataFrame.
+
+    python benchmark_inference.py            # batch sizes 1,10,100,1000
+    BENCH_BATCH_SIZES=1,64 BENCH_ITERATIONS=5000 python benchmark_inference.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+
+from model_loader import LoadedModel, run_prediction, unwrap_linear_estimator
+from predictor import IRIS_FEATURE_COLUMNS, build_features_array, build_features_frame
+from schemas import IrisRecord
+
+
+def _train_estimator() -> LogisticRegression:
+    iris = load_iris(as_frame=True)
+    X = iris.data.set_axis(IRIS_FEATURE_COLUMNS, axis=1)
+    return LogisticRegression(max_iter=1000).fit(X, iris.target)
+
+
+def _load_pyfunc(estimator, tmp_dir: str):
+    try:
+        import mlflow.pyfunc
+        import mlflow.sklearn
+    except ImportError:
+        return None
+    path = os.path.join(tmp_dir, "model")
+    mlflow.sklearn.save_model(estimator, path)
+    return mlflow.pyfunc.load_model(path)
+
+
+def _records(n: int) -> list[IrisRecord]:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0.1, 8.0, size=(n, len(IRIS_FEATURE_COLUMNS)))
+    return [IrisRecord(**dict(zip(IRIS_FEATURE_COLUMNS, row))) for row in values]
+
+
+def _time_calls(fn, iterations: int) -> dict[str, float]:
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - started
+    return {
+        "p50_us": round(float(np.percentile(samples, 50)) * 1e6, 1),
+        "p95_us": round(float(np.percentile(samples, 95)) * 1e6, 1),
+        "mean_us": round(float(samples.mean()) * 1e6, 1),
+    }
+
+
+def main() -> None:
+    batch_sizes = [int(v) for v in os.getenv("BENCH_BATCH_SIZES", "1,10,100,1000").split(",")]
+    iterations = int(os.getenv("BENCH_ITERATIONS", "2000"))
+
+    estimator = _train_estimator()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pyfunc_model = _load_pyfunc(estimator, tmp_dir)
+        current_model = LoadedModel(
+            backend="mlflow",
+            model_uri=None,
+            model=pyfunc_model if pyfunc_model is not None else estimator,
+        )
+        native = (
+            unwrap_linear_estimator(pyfunc_model, IRIS_FEATURE_COLUMNS)
+            if pyfunc_model is not None
+            else None
+        )
+        fast_model = LoadedModel(
+            backend="mlflow",
+            model_uri=None,
+            model=current_model.model,
+            native_model=native if native is not None else estimator,
+        )
+
+        results = []
+        for batch_size in batch_sizes:
+            records = _records(batch_size)
+            current = _time_calls(
+                lambda: run_prediction(current_model, build_features_frame(records)), iterations
+            )
+            fast = _time_calls(
+                lambda: run_prediction(fast_model, build_features_array(records)), iterations
+            )
+            assert run_prediction(current_model, build_features_frame(records)) == run_prediction(
+                fast_model, build_features_array(records)
+            )
+            speedup = current["p50_us"] / fast["p50_us"] if fast["p50_us"] else float("nan")
+            results.append(
+                {"batch_size": batch_size, "current": current, "fast": fast, "p50_speedup": speedup}
+            )
+            print(
+                f"batch={batch_size:>5}  current p50={current['p50_us']:>9.1f}us"
+                f"  fast p50={fast['p50_us']:>8.1f}us  speedup={speedup:>6.1f}x"
+            )
+
+    print(f"Current path: {'mlflow pyfunc' if pyfunc_model is not None else 'sklearn on DataFrame'}")
+    output_path = os.getenv("BENCH_OUTPUT")
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
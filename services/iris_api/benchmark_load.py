@@ -0,0 +1,332 @@
+"""Load test for ``POST /predict``: latency percentiles, throughput and CPU per request.
+
+Runs the API in-process (ASGI transport, client and app share one event loop)
+or as a ``uvicorn`` subprocess driven over HTTP. The model is either the dummy
+backend or a LogisticRegression trained on Iris. With the mlflow package
+installed the estimator is saved as a local MLflow model directory and loaded
+through ``MODEL_URI`` like in production (no tracking server); without it the
+in-process mode hands the estimator to the app directly (thread executor only).
+Each concurrency level sends ``BENCH_REQUESTS`` requests whose batch
+sizes are drawn from ``BENCH_BATCH_MIX`` (``size:weight`` pairs).
+
+    python benchmark_load.py
+    BENCH_MODE=uvicorn BENCH_MODEL=sklearn BENCH_CONCURRENCY=1,16,64 python benchmark_load.py
+    BENCH_OUTPUT=new.json BENCH_BASELINE=old.json python benchmark_load.py
+
+API settings (``INFERENCE_EXECUTOR``, ``PREDICT_BATCHING``, ...) are taken from
+the environment as usual.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from predictor import IRIS_FEATURE_COLUMNS
+
+BENCH_MODES = ("inprocess", "uvicorn")
+BENCH_MODELS = ("dummy", "sklearn")
+
+
+def parse_batch_mix(spec: str) -> tuple[list[int], list[float]]:
+    sizes, weights = [], []
+    for part in spec.split(","):
+        size, _, weight = part.partition(":")
+        sizes.append(int(size))
+        weights.append(float(weight or 1))
+    total = sum(weights)
+    return sizes, [w / total for w in weights]
+
+
+def _payload(batch_size: int, rng: np.random.Generator) -> bytes:
+    values = rng.uniform(0.1, 8.0, size=(batch_size, len(IRIS_FEATURE_COLUMNS))).round(2)
+    records = [dict(zip(IRIS_FEATURE_COLUMNS, row)) for row in values.tolist()]
+    return json.dumps({"records": records}).encode("utf-8")
+
+
+def train_sklearn_model():
+    from sklearn.datasets import load_iris
+    from sklearn.linear_model import LogisticRegression
+
+    iris = load_iris(as_frame=True)
+    X = iris.data.set_axis(IRIS_FEATURE_COLUMNS, axis=1)
+    return LogisticRegression(max_iter=1000).fit(X, iris.target)
+
+
+def save_sklearn_model(estimator, tmp_dir: str) -> str | None:
+    """Save ``estimator`` as a local MLflow model; returns its path, or None without mlflow."""
+    try:
+        import mlflow.sklearn
+    except ImportError:
+        return None
+    path = os.path.join(tmp_dir, "model")
+    mlflow.sklearn.save_model(estimator, path)
+    return path
+
+
+def _process_cpu_seconds(pid: int) -> float | None:
+    """utime + stime of ``pid`` from /proc (Linux only)."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _percentiles_ms(samples: np.ndarray) -> dict[str, float | None]:
+    if not len(samples):
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1e3
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(samples.mean()) * 1e3, 3),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    n_requests: int,
+    payloads: dict[int, bytes],
+    sizes: list[int],
+    weights: list[float],
+    cpu_seconds,
+    seed: int = 0,
+) -> dict:
+    rng = np.random.default_rng(seed)
+    plan = rng.choice(sizes, size=n_requests, p=weights).tolist()
+    latencies = np.empty(n_requests)
+    statuses = np.empty(n_requests, dtype=np.int64)
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < n_requests:
+            i = next_index
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.post(
+                "/predict",
+                content=payloads[plan[i]],
+                headers={"content-type": "application/json"},
+            )
+            latencies[i] = time.perf_counter() - started
+            statuses[i] = response.status_code
+
+    cpu_started = cpu_seconds()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cpu_used = cpu_seconds() - cpu_started if cpu_started is not None else None
+
+    ok = statuses == 200
+    batch_sizes = np.array(plan)
+    per_batch = {
+        str(size): {
+            "requests": int((batch_sizes == size).sum()),
+            **_percentiles_ms(latencies[ok & (batch_sizes == size)]),
+        }
+        for size in sorted(set(plan))
+    }
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "errors": int((~ok).sum()),
+        "status_counts": {str(s): int((statuses == s).sum()) for s in np.unique(statuses)},
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(n_requests / elapsed, 1),
+        "records_per_s": round(int(batch_sizes[ok].sum()) / elapsed, 1),
+        **_percentiles_ms(latencies[ok]),
+        "cpu_ms_per_request": (
+            round(cpu_used / n_requests * 1e3, 3) if cpu_used is not None else None
+        ),
+        "by_batch_size": per_batch,
+    }
+
+
+async def _run_all(client, cfg: dict, cpu_seconds) -> list[dict]:
+    rng = np.random.default_rng(0)
+    payloads = {size: _payload(size, rng) for size in cfg["sizes"]}
+    # Warm-up: lazy imports, first-call model initialisation, connection setup.
+    await run_scenario(
+        client, 4, cfg["warmup"], payloads, cfg["sizes"], cfg["weights"], cpu_seconds
+    )
+    results = []
+    for concurrency in cfg["concurrency"]:
+        result = await run_scenario(
+            client,
+            concurrency,
+            cfg["requests"],
+            payloads,
+            cfg["sizes"],
+            cfg["weights"],
+            cpu_seconds,
+        )
+        results.append(result)
+        print(
+            f"c={concurrency:>4}  {result['requests_per_s']:>9.1f} req/s"
+            f"  p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  p99={result['p99_ms']}ms"
+            f"  cpu/req={result['cpu_ms_per_request']}ms  errors={result['errors']}"
+        )
+    return results
+
+
+async def _run_inprocess(cfg: dict, estimator=None) -> list[dict]:
+    from app import app
+    from model_loader import LoadedModel
+
+    # The app logs at INFO; per-request client logs would dominate the output and the CPU.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async with app.router.lifespan_context(app):
+        if estimator is not None:
+            # Same linear fast path the API takes for an MLflow-loaded sklearn model.
+            app.state.loaded_model = LoadedModel(
+                backend="mlflow",
+                model_uri="benchmark:sklearn",
+                model=estimator,
+                native_model=estimator,
+            )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Client and server share this process, so CPU covers both sides.
+            return await _run_all(client, cfg, time.process_time)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _run_uvicorn(cfg: dict) -> list[dict]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=Path(__file__).resolve().parent,
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=max(cfg["concurrency"]) + 4)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 120
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not become healthy within 120s")
+                await asyncio.sleep(0.2)
+            # Server-side CPU only (the worker pool threads live in the same process).
+            return await _run_all(client, cfg, lambda: _process_cpu_seconds(server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(results: list[dict], baseline: list[dict]) -> None:
+    previous = {r["concurrency"]: r for r in baseline}
+    for result in results:
+        old = previous.get(result["concurrency"])
+        if old is None:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "requests_per_s"):
+            if old.get(key) and result.get(key) is not None:
+                deltas.append(f"{key} {100 * (result[key] / old[key] - 1):+.1f}%")
+        print(f"c={result['concurrency']:>4} vs baseline: {', '.join(deltas)}")
+
+
+def main() -> None:
+    mode = os.getenv("BENCH_MODE", "inprocess")
+    model = os.getenv("BENCH_MODEL", "dummy")
+    if mode not in BENCH_MODES or model not in BENCH_MODELS:
+        raise RuntimeError(
+            f"BENCH_MODE must be one of {BENCH_MODES} and BENCH_MODEL one of {BENCH_MODELS}."
+        )
+    sizes, weights = parse_batch_mix(os.getenv("BENCH_BATCH_MIX", "1:0.7,10:0.2,100:0.1"))
+    batch_mix = {str(size): round(weight, 4) for size, weight in zip(sizes, weights)}
+    cfg = {
+        "concurrency": [int(v) for v in os.getenv("BENCH_CONCURRENCY", "1,8,32").split(",")],
+        "requests": int(os.getenv("BENCH_REQUESTS", "2000")),
+        "warmup": int(os.getenv("BENCH_WARMUP", "200")),
+        "sizes": sizes,
+        "weights": weights,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Keep the benchmark off any real registry or model cache.
+        for name in (
+            "MODEL_URI",
+            "MLFLOW_TRACKING_URI",
+            "MODEL_CACHE_DIR",
+            "MODEL_RELOAD_INTERVAL_S",
+            "SERVED_DATASETS",
+        ):
+            os.environ.pop(name, None)
+        estimator = None
+        if model == "sklearn":
+            estimator = train_sklearn_model()
+            model_path = save_sklearn_model(estimator, tmp_dir)
+            if model_path is not None:
+                os.environ["MODEL_URI"] = model_path
+                estimator = None
+            elif mode == "uvicorn" or os.getenv("INFERENCE_EXECUTOR", "thread") != "thread":
+                raise RuntimeError(
+                    "BENCH_MODEL=sklearn needs the mlflow package (no server) unless"
+                    " BENCH_MODE=inprocess with the thread inference executor."
+                )
+        print(f"mode={mode} model={model} batch_mix={batch_mix}")
+        if mode == "uvicorn":
+            results = asyncio.run(_run_uvicorn(cfg))
+        else:
+            results = asyncio.run(_run_inprocess(cfg, estimator))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "mode": mode,
+            "model": model,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "batch_mix": batch_mix,
+            "env": {
+                k: v
+                for k, v in os.environ.items()
+                if k.startswith(("INFERENCE_", "PREDICT_", "BATCH_", "PREDICTION_CACHE"))
+            },
+        },
+        "scenarios": results,
+    }
+
+    baseline_path = os.getenv("BENCH_BASELINE")
+    if baseline_path:
+        compare(results, json.loads(Path(baseline_path).read_text())["scenarios"])
+
+    output_path = os.getenv("BENCH_OUTPUT")
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
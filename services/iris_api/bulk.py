@@ -0,0 +1,102 @@
+"""Chunked parsing and validation for the bulk-scoring endpoint.
+
+Bodies are read in ``chunk_rows`` slices with the pandas/pyarrow readers and
+validated with vectorized NumPy checks instead of per-record pydantic models.
+"""
+
+import json
+from collections.abc import Iterator
+from typing import BinaryIO
+
+import numpy as np
+import pandas as pd
+
+BULK_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+
+def resolve_bulk_format(content_type: str | None) -> str:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    try:
+        return BULK_CONTENT_TYPES[media_type]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported Content-Type {media_type or '<missing>'!r}. "
+            f"Use one of: {', '.join(BULK_CONTENT_TYPES)}."
+        ) from None
+
+
+def _frame_to_array(frame: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    missing = [c for c in columns if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns {missing}; expected {columns}")
+    return frame[columns].to_numpy(dtype=np.float64)
+
+
+def _iter_ndjson(body: BinaryIO, columns: list[str], chunk_rows: int) -> Iterator[np.ndarray]:
+    with pd.read_json(body, lines=True, chunksize=chunk_rows, dtype=False) as reader:
+        for frame in reader:
+            yield _frame_to_array(frame, columns)
+
+
+def _iter_csv(body: BinaryIO, columns: list[str], chunk_rows: int) -> Iterator[np.ndarray]:
+    with pd.read_csv(body, chunksize=chunk_rows) as reader:
+        for frame in reader:
+            yield _frame_to_array(frame, columns)
+
+
+def _iter_arrow(body: BinaryIO, columns: list[str], chunk_rows: int) -> Iterator[np.ndarray]:
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise RuntimeError("Arrow IPC bodies require pyarrow.") from exc
+
+    with pa.ipc.open_stream(body) as reader:
+        missing = [c for c in columns if c not in reader.schema.names]
+        if missing:
+            raise ValueError(f"Missing feature columns {missing}; expected {columns}")
+        for batch in reader:
+            for start in range(0, batch.num_rows, chunk_rows):
+                part = batch.slice(start, chunk_rows)
+                yield np.column_stack(
+                    [
+                        part.column(c).to_numpy(zero_copy_only=False).astype(np.float64)
+                        for c in columns
+                    ]
+                )
+
+
+_READERS = {"ndjson": _iter_ndjson, "csv": _iter_csv, "arrow": _iter_arrow}
+
+
+def validate_features(features: np.ndarray, row_offset: int) -> None:
+    """Same rule as ``IrisRecord``: every value present, finite and > 0."""
+    invalid = ~np.isfinite(features) | (features <= 0)
+    bad_rows = np.flatnonzero(invalid.any(axis=1))
+    if bad_rows.size:
+        raise ValueError(
+            f"Row {row_offset + int(bad_rows[0])}: feature values must be finite and > 0 "
+            f"({bad_rows.size} invalid rows in this chunk)"
+        )
+
+
+def iter_feature_chunks(
+    body: BinaryIO, fmt: str, columns: list[str], chunk_rows: int
+) -> Iterator[np.ndarray]:
+    row_offset = 0
+    for features in _READERS[fmt](body, columns, chunk_rows):
+        validate_features(features, row_offset)
+        row_offset += len(features)
+        yield features
+
+
+def encode_predictions(predictions: list) -> bytes:
+    return "".join(f'{{"prediction": {json.dumps(p)}}}\n' for p in predictions).encode("utf-8")
+
+
+def encode_error(message: str) -> bytes:
+    return (json.dumps({"error": message}) + "\n").encode("utf-8")
@@ -0,0 +1,177 @@
+"""Dedicated inference worker pool with bounded admission for async handlers.
+
+``thread`` runs predictions on a thread pool (NumPy/sklearn release the GIL
+for the heavy parts); ``process`` runs them in worker processes that each load
+their own copy of the model at start-up and, for ``/models/...`` routes, their
+own ``ModelPool`` on first use; workers send their stage timings back with the
+predictions so ``/metrics`` covers both kinds. Requests beyond ``max_pending`` in
+flight are rejected with ``InferenceSaturated`` instead of queueing unbounded.
+
+Worker processes are spawned (not forked from the threaded server) and every
+pool is warmed up before it takes traffic, including the one built on reload.
+"""
+
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from model_loader import LoadedModel, load_model, observe_stage_timings, predict_with_timings
+from multi_model import ModelPool
+from reloader import warm_up_model
+from settings import IrisApiSettings
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class InferenceSaturated(RuntimeError):
+    pass
+
+
+_WORKER_SETTINGS: IrisApiSettings | None = None
+_WORKER_MODEL: LoadedModel | None = None
+_WORKER_MODEL_POOL: ModelPool | None = None
+
+
+def _init_worker(settings: IrisApiSettings) -> None:
+    global _WORKER_SETTINGS, _WORKER_MODEL
+    _WORKER_SETTINGS = settings
+    _WORKER_MODEL = load_model(settings)
+
+
+def _warm_up_worker() -> None:
+    warm_up_model(_WORKER_MODEL)
+
+
+def _predict_in_worker(features) -> tuple[list, dict[str, float]]:
+    return predict_with_timings(_WORKER_MODEL, features)
+
+
+def _predict_named_in_worker(name: str, ref: str | None, features) -> tuple[list, dict[str, float]]:
+    global _WORKER_MODEL_POOL
+    if _WORKER_MODEL_POOL is None:
+        _WORKER_MODEL_POOL = ModelPool.from_settings(
+            _WORKER_SETTINGS, workers=_WORKER_SETTINGS.inference_workers
+        )
+    return _WORKER_MODEL_POOL.predict_with_timings(name, ref, features)
+
+
+def _observe_worker_timings(worker_future: Future) -> Future:
+    """Future for the predictions of a worker task; its stage timings are recorded here."""
+    future: Future = Future()
+
+    def _done(done: Future) -> None:
+        if future.cancelled():
+            return
+        try:
+            predictions, timings = done.result()
+        except BaseException as exc:
+            future.set_exception(exc)
+            return
+        observe_stage_timings(timings)
+        future.set_result(predictions)
+
+    worker_future.add_done_callback(_done)
+    return future
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        kind: str,
+        max_workers: int,
+        max_pending: int,
+        settings: IrisApiSettings,
+        predict_fn: Callable[..., list],
+        predict_named_fn: Callable[..., list] | None = None,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise RuntimeError(
+                f"Invalid inference executor {kind!r}. Use one of: {', '.join(EXECUTOR_KINDS)}."
+            )
+        self.kind = kind
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._pending = 0
+
+        self._pool: Executor
+        if kind == "process":
+            self._pool = self._start_process_pool(settings)
+            self._task = _predict_in_worker
+            self._named_task = _predict_named_in_worker
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+            self._task = predict_fn
+            self._named_task = predict_named_fn
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, features) -> Future:
+        return self._submit(self._task, features)
+
+    def submit_named(self, name: str, ref: str | None, features) -> Future:
+        """Score with a ``ModelPool`` model (``/models/...`` routes)."""
+        if self._named_task is None:
+            raise RuntimeError("Multi-model serving is disabled.")
+        return self._submit(self._named_task, name, ref, features)
+
+    def _submit(self, task: Callable, *args) -> Future:
+        future = self._pool.submit(task, *args)
+        return _observe_worker_timings(future) if self.kind == "process" else future
+
+    async def run(self, submit: Callable[[], Future]) -> list:
+        """Admit one request and await the future returned by ``submit``.
+
+        Must be called from the event loop thread, which keeps the pending
+        counter free of locks.
+        """
+        if self._pending >= self._max_pending:
+            raise InferenceSaturated(
+                f"Inference queue is full ({self._max_pending} requests in flight)."
+            )
+        self._pending += 1
+        try:
+            return await asyncio.wrap_future(submit())
+        finally:
+            self._pending -= 1
+
+    def reload(self, settings: IrisApiSettings) -> None:
+        """Point process workers at a new model; thread workers read the shared model."""
+        if self.kind != "process":
+            return
+        new_pool = self._start_process_pool(settings)
+        old_pool, self._pool = self._pool, new_pool
+        old_pool.shutdown(wait=False)
+
+    def _start_process_pool(self, settings: IrisApiSettings) -> ProcessPoolExecutor:
+        """Spawn workers, load and warm the model in each, and return the ready pool.
+
+        One warm-up task is submitted per worker so the pool starts all of them;
+        a load failure raises here and the caller keeps its current pool.
+        """
+        pool = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings,),
+        )
+        try:
+            warm_ups = [pool.submit(_warm_up_worker) for _ in range(self._max_workers)]
+            wait(warm_ups)
+            for future in warm_ups:
+                future.result()
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        return pool
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,282 @@
+"""Prometheus text-format metrics with no client library and no hot-path locks.
+
+Counters and histograms keep one shard per writing thread (``threading.local``),
+so ``observe``/``inc`` only touch memory owned by the calling thread; a scrape
+sums the shards. A lock is taken only the first time a thread writes a given
+label set. Histogram buckets are fixed at definition time. Gauges are read from
+callbacks when ``/metrics`` is scraped.
+
+With ``INFERENCE_EXECUTOR=process`` the workers return their ``frame``/``predict``
+timings with the predictions and the API process observes them.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+RECORD_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 5_000, 10_000, 50_000, 100_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value)
+
+
+class _Sharded:
+    """Per-thread shards of ``size`` numbers for one label set."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._shards: list[list[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> list[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(values) for values in zip(*shards)] if shards else [0] * self._size
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], _Sharded] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labelvalues: tuple[str, ...]) -> _Sharded:
+        child = self._children.get(labelvalues)
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(labelvalues, self._new_child())
+        return child
+
+    def _new_child(self) -> _Sharded:
+        raise NotImplementedError
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Sharded:
+        return _Sharded(1)
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._child(labelvalues).shard()[0] += amount
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, child in list(self._children.items()):
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}{labels} {_format_value(child.totals()[0])}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...],
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Sharded:
+        # One slot per bucket, one for +Inf, then the running sum.
+        return _Sharded(len(self.buckets) + 2)
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        shard = self._child(labelvalues).shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, child in list(self._children.items()):
+            totals = child.totals()
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), totals[:-1]):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, labelvalues, f'le="{_format_value(float(bound))}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(float(totals[-1]))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Sampled at scrape time from ``collect`` -> ``{labelvalues: value}``.
+
+    ``kind="counter"`` exposes totals that are kept elsewhere (e.g. cache hits).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: Iterable[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, value in self._collect().items():
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}{labels} {_format_value(float(value))}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        # Registering a name again replaces it: gauges are re-bound on every app startup.
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "iris_api_request_duration_seconds",
+        "HTTP request latency until the response is fully sent.",
+        LATENCY_BUCKETS,
+        labelnames=("route", "method"),
+    )
+)
+REQUESTS = REGISTRY.register(
+    Counter(
+        "iris_api_requests_total",
+        "HTTP requests by route and status code.",
+        labelnames=("route", "method", "status"),
+    )
+)
+ERRORS = REGISTRY.register(
+    Counter(
+        "iris_api_errors_total",
+        "Failed requests by route and reason.",
+        labelnames=("route", "reason"),
+    )
+)
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "iris_api_stage_duration_seconds",
+        "Time spent per request stage (features, frame, predict, serialize).",
+        LATENCY_BUCKETS,
+        labelnames=("stage",),
+    )
+)
+RECORDS_PER_REQUEST = REGISTRY.register(
+    Histogram(
+        "iris_api_records_per_request",
+        "Records scored per prediction request.",
+        RECORD_BUCKETS,
+        labelnames=("route",),
+    )
+)
+
+
+_in_flight = 0
+
+
+def in_flight() -> int:
+    return _in_flight
+
+
+def _route_label(scope) -> str:
+    # Route templates keep label cardinality bounded; unmatched paths share one label.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: no request/response wrapping beyond watching the status."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status = 500
+            ERRORS.inc(_route_label(scope), "unhandled_exception")
+            raise
+        finally:
+            _in_flight -= 1
+            route = _route_label(scope)
+            method = scope["method"]
+            REQUEST_SECONDS.observe(time.perf_counter() - started, route, method)
+            REQUESTS.inc(route, method, str(status))
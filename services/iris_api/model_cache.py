@@ -0,0 +1,220 @@
+"""Content-addressed on-disk cache for MLflow model artifacts.
+
+Entries are keyed by registry version + run id (or run id + artifact path for
+``runs:/`` URIs), so a version is downloaded once per volume and reused across
+restarts and replicas. Registry versions are immutable, so a cached version
+is served without asking MLflow. The cache is size-bounded with LRU eviction
+and can serve previously seen URIs while MLflow is unreachable (offline mode).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from model_registry import get_model_version, parse_registry_uri
+except ModuleNotFoundError:
+    # Images copy model_registry.py next to the service; local runs use services/common.
+    sys.path.append(str(Path(__file__).resolve().parent.parent / "common"))
+    from model_registry import get_model_version, parse_registry_uri
+
+logger = logging.getLogger("iris_api.model_cache")
+
+_META_FILE = "meta.json"
+_MODEL_DIR = "model"
+_RUN_URI_RE = re.compile(r"^runs:/(?P<run_id>[^/]+)/(?P<path>.+)$")
+
+
+@dataclass(frozen=True)
+class CacheResult:
+    path: str
+    hit: bool
+    key: str
+    seconds: float
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class ModelArtifactCache:
+    def __init__(self, root: str, max_bytes: int, tracking_uri: str | None = None) -> None:
+        self._root = Path(root)
+        self._max_bytes = max_bytes
+        self._tracking_uri = tracking_uri
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _identity(self, model_uri: str) -> dict[str, str]:
+        """Stable identity of the artifacts behind ``model_uri``; registry URIs need MLflow."""
+        parsed = parse_registry_uri(model_uri)
+        if parsed is not None:
+            from mlflow.tracking import MlflowClient
+
+            name, alias, ref = parsed
+            client = MlflowClient(tracking_uri=self._tracking_uri)
+            model_version = get_model_version(client, name, alias, ref)
+            return {
+                "name": name,
+                "version": str(model_version.version),
+                "run_id": model_version.run_id or "",
+                "source": model_version.source,
+            }
+
+        run_match = _RUN_URI_RE.match(model_uri)
+        if run_match is not None:
+            return {"run_id": run_match["run_id"], "source": run_match["path"]}
+        return {"source": model_uri}
+
+    @staticmethod
+    def _key(identity: dict[str, str]) -> str:
+        payload = json.dumps(identity, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:32]
+
+    def _entries(self) -> list[tuple[Path, dict]]:
+        entries = []
+        for entry in self._root.iterdir():
+            meta_path = entry / _META_FILE
+            if entry.is_dir() and meta_path.exists():
+                entries.append((entry, json.loads(meta_path.read_text(encoding="utf-8"))))
+        return entries
+
+    def _touch(self, entry: Path) -> None:
+        os.utime(entry / _META_FILE)
+
+    def _download(self, model_uri: str, key: str, identity: dict[str, str]) -> Path:
+        import mlflow.artifacts
+
+        if "version" in identity:
+            # Download the pinned version even if an alias moves meanwhile.
+            model_uri = f"models:/{identity['name']}/{identity['version']}"
+        entry = self._root / key
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self._root))
+        try:
+            mlflow.artifacts.download_artifacts(
+                artifact_uri=model_uri,
+                dst_path=str(tmp_dir / _MODEL_DIR),
+                tracking_uri=self._tracking_uri,
+            )
+            meta = {
+                **identity,
+                "model_uri": model_uri,
+                "size_bytes": _dir_size(tmp_dir),
+                "created_at": time.time(),
+            }
+            (tmp_dir / _META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+            try:
+                tmp_dir.rename(entry)
+            except OSError:
+                # Another worker finished the same download first.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return entry
+
+    def _find_version(self, name: str, version: str) -> Path | None:
+        for entry, meta in self._entries():
+            if meta.get("name") == name and meta.get("version") == version:
+                return entry
+        return None
+
+    def _hit(self, entry: Path, started: float) -> CacheResult:
+        self._touch(entry)
+        return CacheResult(
+            path=str(entry / _MODEL_DIR),
+            hit=True,
+            key=entry.name,
+            seconds=time.perf_counter() - started,
+        )
+
+    def _find_offline(self, model_uri: str) -> Path | None:
+        """Most recently used entry for ``model_uri``.
+
+        Aliases and stages cannot be resolved offline, so any cached version of
+        the same registered model qualifies for them.
+        """
+        parsed = parse_registry_uri(model_uri)
+        moving = parsed is not None and not (parsed[2] or "").isdigit()
+        matches = [
+            (entry, meta)
+            for entry, meta in self._entries()
+            if meta.get("model_uri") == model_uri or (moving and meta.get("name") == parsed[0])
+        ]
+        if not matches:
+            return None
+        return max(matches, key=lambda item: (item[0] / _META_FILE).stat().st_mtime)[0]
+
+    def evict(self, keep: Path | None = None) -> None:
+        entries = sorted(self._entries(), key=lambda item: (item[0] / _META_FILE).stat().st_mtime)
+        total = sum(int(meta.get("size_bytes", 0)) for _, meta in entries)
+        for entry, meta in entries:
+            if total <= self._max_bytes:
+                break
+            if keep is not None and entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= int(meta.get("size_bytes", 0))
+            logger.info(
+                "Evicted cached model %s (%s bytes)", meta.get("model_uri"), meta.get("size_bytes")
+            )
+
+    def fetch(
+        self, model_uri: str, offline: bool = False, version: str | None = None
+    ) -> CacheResult:
+        """Local path of the artifacts behind ``model_uri``, downloading them on a miss.
+
+        ``version`` is the registry version the caller already resolved. A cached
+        version is then a hit without any MLflow call; in offline mode a moving
+        ref that could not be resolved goes straight to the newest cached version.
+        """
+        started = time.perf_counter()
+        parsed = parse_registry_uri(model_uri)
+        if parsed is not None:
+            name, _, ref = parsed
+            if version is None and ref is not None and ref.isdigit():
+                version = ref
+            if version is not None:
+                entry = self._find_version(name, str(version))
+                if entry is not None:
+                    return self._hit(entry, started)
+            elif offline:
+                entry = self._find_offline(model_uri)
+                if entry is None:
+                    raise RuntimeError(f"{model_uri} is not in the model cache (offline mode).")
+                logger.warning("Serving %s from the model cache (offline mode)", model_uri)
+                return self._hit(entry, started)
+
+        try:
+            identity = self._identity(model_uri)
+        except Exception:
+            if not offline:
+                raise
+            entry = self._find_offline(model_uri)
+            if entry is None:
+                raise
+            logger.warning("MLflow unreachable; serving %s from cache (offline mode)", model_uri)
+            return self._hit(entry, started)
+
+        key = self._key(identity)
+        entry = self._root / key
+        hit = (entry / _META_FILE).exists()
+        if hit:
+            self._touch(entry)
+        else:
+            entry = self._download(model_uri, key, identity)
+            self.evict(keep=entry)
+
+        return CacheResult(
+            path=str(entry / _MODEL_DIR),
+            hit=hit,
+            key=key,
+            seconds=time.perf_counter() - started,
+        )
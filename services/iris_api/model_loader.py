@@ -1,10 +1,20 @@
-from dataclasses import dataclass
+import logging
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from datetime import datetime, timezone
 from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 
+from metrics import STAGE_SECONDS
+from predictor import IRIS_FEATURE_COLUMNS, features_array_to_frame
 from settings import IrisApiSettings
 
+logger = logging.getLogger("iris_api.model_loader")
+
 
 class DummyIrisModel:
     def predict(self, features_df: pd.DataFrame) -> list[int]:
@@ -16,16 +26,143 @@ class LoadedModel:
     backend: Literal["dummy", "mlflow"]
     model_uri: str | None
     model: Any
+    # Native sklearn linear estimator unwrapped from the pyfunc model, if any.
+    native_model: Any | None = None
+    version: str | None = None
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    load_seconds: float = 0.0
+    feature_columns: list[str] = field(default_factory=lambda: list(IRIS_FEATURE_COLUMNS))
+    # Approximate in-memory footprint, used for the multi-model memory budget.
+    size_bytes: int = 0
+
+
+def _raw_model(model: Any) -> Any | None:
+    get_raw_model = getattr(model, "get_raw_model", None)
+    if get_raw_model is not None:
+        try:
+            return get_raw_model()
+        except Exception:
+            pass
+    return getattr(getattr(model, "_model_impl", None), "sklearn_model", None)
+
+
+def _array_bytes(obj: Any, seen: dict[int, Any]) -> int:
+    """Bytes held by NumPy arrays reachable from ``obj`` (fitted attributes, nested estimators)."""
+    if id(obj) in seen or isinstance(obj, (type, str, bytes, int, float, bool, np.generic)):
+        return 0
+    # Keep a reference so temporary state dicts are not freed and their ids reused.
+    seen[id(obj)] = obj
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return obj.nbytes + sum(_array_bytes(item, seen) for item in obj.flat)
+        return obj.nbytes
+    if isinstance(obj, (list, tuple)):
+        return sum(_array_bytes(item, seen) for item in obj)
+    if isinstance(obj, dict):
+        return sum(_array_bytes(value, seen) for value in obj.values())
+    state = getattr(obj, "__dict__", None)
+    if state is None:
+        # Extension types such as sklearn's Tree expose their arrays through __getstate__.
+        try:
+            state = obj.__getstate__()
+        except Exception:
+            return 0
+    return _array_bytes(state, seen) if isinstance(state, dict) else 0
+
+
+def estimate_model_bytes(model: Any, model_path: str | None = None) -> int:
+    """Array memory of the underlying estimator, else the size of the local artifacts."""
+    raw_model = _raw_model(model)
+    if raw_model is not None:
+        size = _array_bytes(raw_model, {})
+        if size:
+            return size
+    if model_path is not None and Path(model_path).is_dir():
+        return sum(f.stat().st_size for f in Path(model_path).rglob("*") if f.is_file())
+    return 0
+
+
+def unwrap_linear_estimator(
+    model: Any, feature_columns: list[str] | None = None, probe_rows: int = 64
+) -> Any | None:
+    """Return the fitted linear estimator behind an MLflow pyfunc model, or None.
+
+    Duck-typed on ``coef_``/``intercept_``, and accepted only if ``predict_native``
+    reproduces the estimator's own ``predict`` on a random probe batch. That rules
+    out non-identity links (GLMs), one-vs-one SVMs and outlier detectors. An
+    estimator fit on columns in a different order than ``feature_columns`` is also
+    rejected, since the fast path feeds the matrix positionally.
+    """
+    raw_model = _raw_model(model)
+    coef = getattr(raw_model, "coef_", None)
+    if not isinstance(coef, np.ndarray) or getattr(raw_model, "intercept_", None) is None:
+        return None
+    fitted_columns = getattr(raw_model, "feature_names_in_", None)
+    if fitted_columns is not None:
+        expected_columns = feature_columns or IRIS_FEATURE_COLUMNS
+        if list(fitted_columns) != list(expected_columns):
+            logger.info(
+                "Model was fit on columns %s, not %s; using the pyfunc path.",
+                list(fitted_columns),
+                list(expected_columns),
+            )
+            return None
+
+    probe = np.random.default_rng(0).standard_normal((probe_rows, coef.shape[-1]))
+    try:
+        with warnings.catch_warnings():
+            # Estimators fit on DataFrames warn about the probe's missing feature names.
+            warnings.simplefilter("ignore")
+            expected = np.asarray(raw_model.predict(probe))
+        actual = np.asarray(predict_native(raw_model, probe))
+    except Exception:
+        return None
+    if actual.shape != expected.shape:
+        return None
+    if expected.dtype.kind == "f":
+        matches = np.allclose(actual, expected, rtol=1e-6, atol=1e-9)
+    else:
+        matches = np.array_equal(actual, expected)
+    return raw_model if matches else None
+
+
+def predict_native(estimator: Any, features: np.ndarray) -> np.ndarray:
+    """Evaluate a fitted linear model directly on a float64 matrix.
+
+    Equivalent to ``estimator.predict`` but skips sklearn's per-call input
+    validation and feature-name checks, which dominate for small batches.
+    """
+    if features.ndim != 2 or features.shape[1] != estimator.coef_.shape[-1]:
+        raise ValueError(
+            f"Expected {estimator.coef_.shape[-1]} features, got shape {features.shape}"
+        )
+
+    scores = features @ estimator.coef_.T + estimator.intercept_
+    if not hasattr(estimator, "classes_"):
+        return scores
+    if scores.ndim == 1 or scores.shape[1] == 1:
+        indices = (scores.reshape(-1) > 0).astype(np.intp)
+    else:
+        indices = scores.argmax(axis=1)
+    return estimator.classes_[indices]
 
 
-def load_model(settings: IrisApiSettings) -> LoadedModel:
+def load_model(
+    settings: IrisApiSettings,
+    version: str | None = None,
+    feature_columns: list[str] | None = None,
+) -> LoadedModel:
+    columns = list(feature_columns or IRIS_FEATURE_COLUMNS)
     if settings.model_uri is None:
         return LoadedModel(
             backend="dummy",
             model_uri=None,
             model=DummyIrisModel(),
+            feature_columns=columns,
         )
 
+    started = time.perf_counter()
+
     try:
         import mlflow
     except ImportError as exc:
@@ -36,16 +173,68 @@ def load_model(settings: IrisApiSettings) -> LoadedModel:
     if settings.mlflow_tracking_uri:
         mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
 
-    model = mlflow.pyfunc.load_model(settings.model_uri)
+    model_path = settings.model_uri
+    if settings.model_cache_dir:
+        from model_cache import ModelArtifactCache
+
+        cache = ModelArtifactCache(
+            settings.model_cache_dir,
+            max_bytes=settings.model_cache_max_bytes,
+            tracking_uri=settings.mlflow_tracking_uri,
+        )
+        cached = cache.fetch(settings.model_uri, offline=settings.model_offline, version=version)
+        model_path = cached.path
+        logger.info(
+            "Model cache %s for %s (key=%s) in %.3fs",
+            "hit" if cached.hit else "miss",
+            settings.model_uri,
+            cached.key,
+            cached.seconds,
+        )
+
+    deserialize_started = time.perf_counter()
+    model = mlflow.pyfunc.load_model(model_path)
+    logger.info(
+        "Loaded model %s in %.3fs (deserialize %.3fs)",
+        settings.model_uri,
+        time.perf_counter() - started,
+        time.perf_counter() - deserialize_started,
+    )
     return LoadedModel(
         backend="mlflow",
         model_uri=settings.model_uri,
         model=model,
+        native_model=unwrap_linear_estimator(model, columns),
+        version=version,
+        load_seconds=time.perf_counter() - started,
+        feature_columns=columns,
+        size_bytes=estimate_model_bytes(model, model_path),
     )
 
 
-def run_prediction(loaded_model: LoadedModel, features_df: pd.DataFrame) -> list[int | float | str]:
-    raw_predictions = loaded_model.model.predict(features_df)
+def predict_with_timings(
+    loaded_model: LoadedModel, features: pd.DataFrame | np.ndarray
+) -> tuple[list[int | float | str], dict[str, float]]:
+    """Predictions plus the seconds spent per ``STAGE_SECONDS`` stage, unobserved.
+
+    Worker processes return the timings so the API process can record them.
+    """
+    timings: dict[str, float] = {}
+    if isinstance(features, np.ndarray) and loaded_model.native_model is None:
+        started = time.perf_counter()
+        features = features_array_to_frame(features, loaded_model.feature_columns)
+        timings["frame"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if isinstance(features, np.ndarray):
+        raw_predictions = predict_native(loaded_model.native_model, features)
+    else:
+        raw_predictions = loaded_model.model.predict(features)
+    timings["predict"] = time.perf_counter() - started
+
+    # A non-object ndarray converts to Python scalars in one vectorized step.
+    if isinstance(raw_predictions, np.ndarray) and raw_predictions.dtype != object:
+        return raw_predictions.tolist(), timings
 
     if hasattr(raw_predictions, "tolist"):
         raw_predictions = raw_predictions.tolist()
@@ -55,4 +244,17 @@ def run_prediction(loaded_model: LoadedModel, features_df: pd.DataFrame) -> list
         if hasattr(value, "item"):
             value = value.item()
         normalized.append(value)
-    return normalized
+    return normalized, timings
+
+
+def observe_stage_timings(timings: dict[str, float]) -> None:
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, stage)
+
+
+def run_prediction(
+    loaded_model: LoadedModel, features: pd.DataFrame | np.ndarray
+) -> list[int | float | str]:
+    predictions, timings = predict_with_timings(loaded_model, features)
+    observe_stage_timings(timings)
+    return predictions
@@ -0,0 +1,264 @@
+"""Serve several registered models from one process.
+
+Each served dataset contract (``/datasets/<name>/config.yaml``) names its
+registered model in ``serving.registered_model_name`` and supplies the input
+columns via ``contracts.required_feature_columns`` (minus the target column).
+Models are loaded lazily on first request, keyed by the concrete registry
+version, and evicted least-recently-used once ``MODEL_MEMORY_BUDGET_MB`` is
+exceeded (split evenly across workers with ``INFERENCE_EXECUTOR=process``).
+Moving refs (``latest``, stages, aliases) are re-resolved once they are older
+than ``MODEL_REF_TTL_S``; a version that no moving ref points at any more is
+dropped. Predictions run on the shared ``InferenceExecutor``.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from model_loader import LoadedModel, predict_with_timings, run_prediction
+from reloader import (
+    ModelReference,
+    ModelVersionNotFound,
+    load_reference,
+    resolve_model_reference,
+    warm_up_model,
+)
+from settings import IrisApiSettings
+
+logger = logging.getLogger("iris_api.multi_model")
+
+
+class UnknownModel(KeyError):
+    pass
+
+
+class UnknownModelVersion(KeyError):
+    pass
+
+
+def _is_missing_version(exc: Exception) -> bool:
+    """Registry "not found" errors: no version for the ref, or no such version/alias."""
+    return (
+        isinstance(exc, ModelVersionNotFound)
+        or getattr(exc, "error_code", None) == "RESOURCE_DOES_NOT_EXIST"
+    )
+
+
+@dataclass(frozen=True)
+class ServedModelSpec:
+    name: str
+    dataset_name: str
+    feature_columns: list[str]
+    default_ref: str = "latest"
+
+
+def load_served_model_spec(path: Path) -> ServedModelSpec:
+    if not path.is_file():
+        raise RuntimeError(f"Dataset config not found: {path}")
+
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    serving = raw.get("serving") or {}
+    try:
+        dataset_name = str(raw["dataset_name"])
+        target_column = str(raw["warehouse"]["target_column"])
+        required_columns = [str(c) for c in raw["contracts"]["required_feature_columns"]]
+        name = str(serving["registered_model_name"])
+    except KeyError as e:
+        raise RuntimeError(f"Missing key in dataset config {path}: {e}") from e
+
+    feature_columns = [c for c in required_columns if c != target_column]
+    if not feature_columns:
+        raise RuntimeError(f"No feature columns in contracts.required_feature_columns of {path}")
+    return ServedModelSpec(
+        name=name,
+        dataset_name=dataset_name,
+        feature_columns=feature_columns,
+        default_ref=str(serving.get("default_model_ref", "latest")),
+    )
+
+
+def load_served_model_specs(
+    datasets_dir: str, dataset_names: Sequence[str]
+) -> dict[str, ServedModelSpec]:
+    specs: dict[str, ServedModelSpec] = {}
+    for dataset_name in dataset_names:
+        spec = load_served_model_spec(Path(datasets_dir) / dataset_name / "config.yaml")
+        specs[spec.name] = spec
+    return specs
+
+
+def model_uri_for(name: str, ref: str) -> str:
+    """``ref`` is a version number, ``latest``, a stage, or ``@alias``."""
+    if ref.startswith("@"):
+        return f"models:/{name}{ref}"
+    return f"models:/{name}/{ref}"
+
+
+def is_moving_ref(ref: str) -> bool:
+    return not ref.isdigit()
+
+
+def build_records_array(records: Sequence[Mapping[str, float]], columns: list[str]) -> np.ndarray:
+    """Float64 matrix in ``columns`` order; raises ValueError on missing columns."""
+    try:
+        return np.array([[record[c] for c in columns] for record in records], dtype=np.float64)
+    except KeyError as e:
+        raise ValueError(f"Missing feature column {e.args[0]!r}; expected {columns}") from e
+
+
+class ModelPool:
+    def __init__(
+        self,
+        settings: IrisApiSettings,
+        specs: dict[str, ServedModelSpec],
+        memory_budget_bytes: int,
+        ref_ttl_s: float,
+    ) -> None:
+        self._settings = replace(settings, model_registry_file=None)
+        self._specs = specs
+        self._memory_budget_bytes = memory_budget_bytes
+        self._ref_ttl_s = ref_ttl_s
+        self._models: OrderedDict[str, LoadedModel] = OrderedDict()
+        # Moving ref URI -> (pinned reference, monotonic time it was resolved).
+        self._resolved: dict[str, tuple[ModelReference, float]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    @classmethod
+    def from_settings(cls, settings: IrisApiSettings, workers: int = 1) -> "ModelPool":
+        """Pool for one of ``workers`` processes, each getting an equal share of the budget."""
+        return cls(
+            settings,
+            specs=load_served_model_specs(settings.datasets_dir, settings.served_datasets),
+            memory_budget_bytes=settings.model_memory_budget_bytes // workers,
+            ref_ttl_s=settings.model_ref_ttl_s,
+        )
+
+    @property
+    def specs(self) -> dict[str, ServedModelSpec]:
+        return self._specs
+
+    def spec(self, name: str) -> ServedModelSpec:
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise UnknownModel(name) from None
+
+    def loaded(self) -> list[LoadedModel]:
+        with self._lock:
+            return list(self._models.values())
+
+    def _resolve(self, requested_uri: str, moving: bool) -> ModelReference:
+        settings = replace(self._settings, model_uri=requested_uri)
+        if not moving:
+            # Fixed versions resolve without a registry call.
+            return resolve_model_reference(settings)
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._resolved.get(requested_uri)
+        if cached is not None and now - cached[1] < self._ref_ttl_s:
+            return cached[0]
+
+        try:
+            reference = resolve_model_reference(settings)
+        except Exception:
+            if cached is None:
+                raise
+            logger.warning(
+                "Could not re-resolve %s; keeping %s", requested_uri, cached[0].model_uri
+            )
+            reference = cached[0]
+
+        with self._lock:
+            self._resolved[requested_uri] = (reference, now)
+            if cached is not None and cached[0].model_uri != reference.model_uri:
+                logger.info(
+                    "%s moved from %s to %s",
+                    requested_uri,
+                    cached[0].model_uri,
+                    reference.model_uri,
+                )
+                if not self._is_referenced(cached[0].model_uri):
+                    self._drop(cached[0].model_uri)
+                    logger.info("Unloaded %s: no moving ref points at it", cached[0].model_uri)
+        return reference
+
+    def _is_referenced(self, key: str) -> bool:
+        return any(reference.model_uri == key for reference, _ in self._resolved.values())
+
+    def _drop(self, key: str) -> None:
+        """Forget a model version; callers hold ``self._lock``."""
+        self._models.pop(key, None)
+        self._load_locks.pop(key, None)
+        for uri, (reference, _) in list(self._resolved.items()):
+            if reference.model_uri == key:
+                del self._resolved[uri]
+
+    def get(self, name: str, ref: str | None = None) -> LoadedModel:
+        spec = self.spec(name)
+        ref = ref or spec.default_ref
+        try:
+            reference = self._resolve(model_uri_for(name, ref), moving=is_moving_ref(ref))
+        except Exception as exc:
+            if _is_missing_version(exc):
+                raise UnknownModelVersion(f"{name}/{ref}") from exc
+            raise
+        key = reference.model_uri
+
+        with self._lock:
+            loaded_model = self._models.get(key)
+            if loaded_model is not None:
+                self._models.move_to_end(key)
+                return loaded_model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                loaded_model = self._models.get(key)
+            if loaded_model is None:
+                try:
+                    loaded_model = load_reference(self._settings, reference, spec.feature_columns)
+                    warm_up_model(loaded_model)
+                except Exception as exc:
+                    with self._lock:
+                        self._load_locks.pop(key, None)
+                    if _is_missing_version(exc):
+                        raise UnknownModelVersion(f"{name}/{ref}") from exc
+                    raise
+                with self._lock:
+                    self._models[key] = loaded_model
+                    self._evict(keep=key)
+                logger.info(
+                    "Loaded %s (%.1f MB) in %.2fs",
+                    key,
+                    loaded_model.size_bytes / 1024**2,
+                    loaded_model.load_seconds,
+                )
+        return loaded_model
+
+    def _evict(self, keep: str) -> None:
+        total = sum(m.size_bytes for m in self._models.values())
+        for key in list(self._models):
+            if total <= self._memory_budget_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._models[key].size_bytes
+            self._drop(key)
+            logger.info("Evicted %s to stay within the model memory budget", key)
+
+    def predict(self, name: str, ref: str | None, features: np.ndarray) -> list:
+        return run_prediction(self.get(name, ref), features)
+
+    def predict_with_timings(
+        self, name: str, ref: str | None, features: np.ndarray
+    ) -> tuple[list, dict[str, float]]:
+        return predict_with_timings(self.get(name, ref), features)
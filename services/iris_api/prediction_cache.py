@@ -0,0 +1,87 @@
+"""Bounded LRU/TTL cache of per-record predictions.
+
+Keys are the model identity plus the raw bytes of the float64 feature row, so
+a request can mix cached rows with rows that still need the model.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def canonical_rows(features: np.ndarray) -> list[bytes]:
+    """One byte key per row; ``+ 0.0`` folds -0.0 into 0.0."""
+    canonical = np.ascontiguousarray(features, dtype=np.float64) + 0.0
+    return [row.tobytes() for row in canonical]
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int, ttl_s: float = 0.0) -> None:
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._entries: OrderedDict[tuple[Hashable, bytes], tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def lookup(
+        self, model_key: Hashable, rows: list[bytes]
+    ) -> tuple[list[object | None], list[int]]:
+        """Cached predictions per row (None for misses) and the indices of the misses."""
+        now = time.monotonic()
+        results: list[object | None] = [None] * len(rows)
+        misses: list[int] = []
+        with self._lock:
+            for i, row in enumerate(rows):
+                key = (model_key, row)
+                entry = self._entries.get(key)
+                if entry is None or (self._ttl_s > 0 and entry[0] < now):
+                    if entry is not None:
+                        del self._entries[key]
+                    misses.append(i)
+                    continue
+                self._entries.move_to_end(key)
+                results[i] = entry[1]
+            self._hits += len(rows) - len(misses)
+            self._misses += len(misses)
+        return results, misses
+
+    def store(self, model_key: Hashable, rows: list[bytes], predictions: list) -> None:
+        expires_at = time.monotonic() + self._ttl_s
+        with self._lock:
+            for row, prediction in zip(rows, predictions):
+                key = (model_key, row)
+                self._entries[key] = (expires_at, prediction)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+                max_entries=self._max_entries,
+            )
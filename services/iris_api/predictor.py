@@ -1,3 +1,6 @@
+from operator import attrgetter
+
+import numpy as np
 import pandas as pd
 
 from schemas import IrisRecord
@@ -9,9 +12,22 @@ IRIS_FEATURE_COLUMNS = [
     "petal_width_cm",
 ]
 
+_get_iris_features = attrgetter(*IRIS_FEATURE_COLUMNS)
+
 
 def build_features_frame(records: list[IrisRecord]) -> pd.DataFrame:
     return pd.DataFrame(
         [record.model_dump() for record in records],
         columns=IRIS_FEATURE_COLUMNS,
     )
+
+
+def build_features_array(records: list[IrisRecord]) -> np.ndarray:
+    """C-contiguous float64 matrix in IRIS_FEATURE_COLUMNS order, without pandas."""
+    return np.array([_get_iris_features(record) for record in records], dtype=np.float64)
+
+
+def features_array_to_frame(
+    features: np.ndarray, columns: list[str] = IRIS_FEATURE_COLUMNS
+) -> pd.DataFrame:
+    return pd.DataFrame(features, columns=columns)
@@ -0,0 +1,154 @@
+"""Background model reloading from the MLflow registry or a local registry file.
+
+The reloader resolves the configured reference (``models:/<name>@<alias>``,
+``models:/<name>/<stage>``, or the URI written in ``MODEL_REGISTRY_FILE``) to a
+concrete version. When it changes, the new model is loaded and warmed up off
+the request path and then handed to ``on_swap``; failures keep the old model.
+"""
+
+import logging
+import sys
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+
+from model_loader import LoadedModel, load_model, run_prediction
+from settings import IrisApiSettings
+
+try:
+    from model_registry import ModelVersionNotFound, get_model_version, parse_registry_uri
+except ModuleNotFoundError:
+    # Images copy model_registry.py next to the service; local runs use services/common.
+    sys.path.append(str(Path(__file__).resolve().parent.parent / "common"))
+    from model_registry import ModelVersionNotFound, get_model_version, parse_registry_uri
+
+logger = logging.getLogger("iris_api.reloader")
+
+
+@dataclass(frozen=True)
+class ModelReference:
+    model_uri: str | None
+    version: str | None = None
+
+
+def _mlflow_client(settings: IrisApiSettings):
+    from mlflow.tracking import MlflowClient
+
+    return MlflowClient(tracking_uri=settings.mlflow_tracking_uri)
+
+
+def _read_registry_file(path: str) -> str | None:
+    content = Path(path).read_text(encoding="utf-8").strip()
+    return content or None
+
+
+def resolve_model_reference(settings: IrisApiSettings) -> ModelReference:
+    """Pin the configured model URI to a concrete registry version where possible."""
+    model_uri = settings.model_uri
+    if settings.model_registry_file:
+        model_uri = _read_registry_file(settings.model_registry_file)
+    if model_uri is None:
+        return ModelReference(model_uri=None)
+
+    parsed = parse_registry_uri(model_uri)
+    if parsed is None:
+        # runs:/..., s3://..., local paths: the URI itself identifies the model.
+        return ModelReference(model_uri=model_uri)
+
+    name, alias, ref = parsed
+    if ref is not None and ref.isdigit():
+        return ModelReference(model_uri=model_uri, version=ref)
+
+    version = get_model_version(_mlflow_client(settings), name, alias, ref).version
+    return ModelReference(model_uri=f"models:/{name}/{version}", version=str(version))
+
+
+def resolve_startup_reference(settings: IrisApiSettings) -> ModelReference:
+    """Like ``resolve_model_reference``, but falls back to the cache in offline mode."""
+    try:
+        return resolve_model_reference(settings)
+    except Exception:
+        if not (settings.model_offline and settings.model_cache_dir):
+            raise
+        logger.warning(
+            "Could not resolve %s from MLflow; trying the local model cache.", settings.model_uri
+        )
+        return ModelReference(model_uri=settings.model_uri)
+
+
+def load_reference(
+    settings: IrisApiSettings,
+    reference: ModelReference,
+    feature_columns: list[str] | None = None,
+) -> LoadedModel:
+    return load_model(
+        replace(settings, model_uri=reference.model_uri),
+        version=reference.version,
+        feature_columns=feature_columns,
+    )
+
+
+def warm_up_model(loaded_model: LoadedModel, rows: int = 8) -> None:
+    """Run a synthetic batch so lazy initialisation happens before serving traffic."""
+    n_features = len(loaded_model.feature_columns)
+    run_prediction(loaded_model, np.ones((rows, n_features), dtype=np.float64))
+
+
+class ModelReloader:
+    def __init__(
+        self,
+        settings: IrisApiSettings,
+        current: ModelReference,
+        on_swap: Callable[[LoadedModel, ModelReference], None],
+    ) -> None:
+        self._settings = settings
+        self._current = current
+        self._on_swap = on_swap
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def current(self) -> ModelReference:
+        return self._current
+
+    def check_once(self) -> bool:
+        reference = resolve_model_reference(self._settings)
+        if reference == self._current:
+            return False
+
+        loaded_model = load_reference(self._settings, reference)
+        warm_up_model(loaded_model)
+        self._on_swap(loaded_model, reference)
+        logger.info(
+            "Swapped model %s (version=%s) -> %s (version=%s), load took %.2fs",
+            self._current.model_uri,
+            self._current.version,
+            reference.model_uri,
+            reference.version,
+            loaded_model.load_seconds,
+        )
+        self._current = reference
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None or self._settings.model_reload_interval_s <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._settings.model_reload_interval_s):
+            try:
+                self.check_once()
+            except Exception:
+                logger.exception("Model reload failed; keeping the current model.")
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -22,5 +23,38 @@ class ModelInfoResponse(BaseModel):
     model_backend: Literal["dummy", "mlflow"]
     model_loaded: bool
     model_uri: str | None = None
+    model_version: str | None = None
+    loaded_at: datetime | None = None
+    load_seconds: float | None = None
     feature_columns: list[str]
     note: str
+
+
+class ModelPredictRequest(BaseModel):
+    # Keys are the feature columns from the model's dataset contract.
+    records: list[dict[str, float]] = Field(..., min_length=1)
+
+
+class LoadedModelInfo(BaseModel):
+    model_uri: str | None
+    model_version: str | None = None
+    loaded_at: datetime
+    load_seconds: float
+    size_bytes: int
+
+
+class ServedModelInfo(BaseModel):
+    name: str
+    dataset_name: str
+    default_ref: str
+    feature_columns: list[str]
+    loaded: list[LoadedModelInfo]
+
+
+class PredictionCacheStatsResponse(BaseModel):
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    entries: int = 0
+    max_entries: int = 0
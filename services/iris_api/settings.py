@@ -6,6 +6,26 @@ from dataclasses import dataclass
 class IrisApiSettings:
     mlflow_tracking_uri: str | None
     model_uri: str | None
+    batching_enabled: bool = False
+    batch_max_records: int = 64
+    batch_max_wait_ms: float = 2.0
+    inference_executor: str = "thread"
+    inference_workers: int = 4
+    inference_max_pending: int = 64
+    model_registry_file: str | None = None
+    model_reload_interval_s: float = 0.0
+    model_cache_dir: str | None = None
+    model_cache_max_bytes: int = 2 * 1024**3
+    model_offline: bool = False
+    datasets_dir: str = "/datasets"
+    served_datasets: tuple[str, ...] = ()
+    model_memory_budget_bytes: int = 1024**3
+    model_ref_ttl_s: float = 60.0
+    prediction_cache_enabled: bool = False
+    prediction_cache_max_entries: int = 100_000
+    prediction_cache_ttl_s: float = 0.0
+    bulk_chunk_rows: int = 10_000
+    bulk_spool_max_bytes: int = 64 * 1024**2
 
 
 def _normalize_optional_env(name: str) -> str | None:
@@ -16,8 +36,64 @@ def _normalize_optional_env(name: str) -> str | None:
     return value or None
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = _normalize_optional_env(name)
+    if value is None:
+        return default
+
+    normalized = value.lower()
+    if normalized in {"1", "true", "yes", "y", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "n", "off"}:
+        return False
+    raise RuntimeError(
+        f"Invalid boolean for {name}: {value!r}. Use one of true/false, 1/0, yes/no."
+    )
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    value = _normalize_optional_env(name)
+    parsed = default if value is None else int(value)
+    if parsed < minimum:
+        raise RuntimeError(f"{name} must be >= {minimum}, got: {parsed}")
+    return parsed
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    value = _normalize_optional_env(name)
+    parsed = default if value is None else float(value)
+    if parsed < minimum:
+        raise RuntimeError(f"{name} must be >= {minimum}, got: {parsed}")
+    return parsed
+
+
+def _env_list(name: str) -> tuple[str, ...]:
+    value = _normalize_optional_env(name) or ""
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
 def load_settings() -> IrisApiSettings:
     return IrisApiSettings(
         mlflow_tracking_uri=_normalize_optional_env("MLFLOW_TRACKING_URI"),
         model_uri=_normalize_optional_env("MODEL_URI"),
+        batching_enabled=_env_bool("PREDICT_BATCHING", default=False),
+        batch_max_records=_env_int("PREDICT_BATCH_MAX_RECORDS", default=64),
+        batch_max_wait_ms=_env_float("PREDICT_BATCH_MAX_WAIT_MS", default=2.0),
+        inference_executor=_normalize_optional_env("INFERENCE_EXECUTOR") or "thread",
+        inference_workers=_env_int("INFERENCE_WORKERS", default=4),
+        inference_max_pending=_env_int("INFERENCE_MAX_PENDING", default=64),
+        model_registry_file=_normalize_optional_env("MODEL_REGISTRY_FILE"),
+        model_reload_interval_s=_env_float("MODEL_RELOAD_INTERVAL_S", default=0.0),
+        model_cache_dir=_normalize_optional_env("MODEL_CACHE_DIR"),
+        model_cache_max_bytes=_env_int("MODEL_CACHE_MAX_MB", default=2048) * 1024**2,
+        model_offline=_env_bool("MODEL_OFFLINE", default=False),
+        datasets_dir=_normalize_optional_env("DATASETS_DIR") or "/datasets",
+        served_datasets=_env_list("SERVED_DATASETS"),
+        model_memory_budget_bytes=_env_int("MODEL_MEMORY_BUDGET_MB", default=1024) * 1024**2,
+        model_ref_ttl_s=_env_float("MODEL_REF_TTL_S", default=60.0),
+        prediction_cache_enabled=_env_bool("PREDICTION_CACHE", default=False),
+        prediction_cache_max_entries=_env_int("PREDICTION_CACHE_MAX_ENTRIES", default=100_000),
+        prediction_cache_ttl_s=_env_float("PREDICTION_CACHE_TTL_S", default=0.0),
+        bulk_chunk_rows=_env_int("BULK_CHUNK_ROWS", default=10_000),
+        bulk_spool_max_bytes=_env_int("BULK_SPOOL_MB", default=64) * 1024**2,
     )
@@ -9,6 +9,14 @@ from botocore.exceptions import ClientError
 from sklearn.datasets import load_iris
 
 
+STORAGE_FORMATS = ("csv", "parquet", "arrow")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
 def env(name: str, default: str | None = None) -> str:
     value = os.getenv(name, default)
     if not value:
@@ -38,6 +46,7 @@ class DatasetContract:
     version: str
     storage_bucket: str
     storage_key: str
+    storage_format: str = "csv"
 
 
 def resolve_dataset_config_path() -> Path:
@@ -57,6 +66,7 @@ def load_dataset_contract(path: Path) -> DatasetContract:
         version = str(raw["version"])
         storage_bucket = str(raw["storage"]["bucket"])
         storage_key = str(raw["storage"]["key"])
+        storage_format = str(raw["storage"].get("format", "csv"))
     except KeyError as e:
         raise RuntimeError(f"Missing key in dataset config {path}: {e}") from e
 
@@ -65,6 +75,7 @@ def load_dataset_contract(path: Path) -> DatasetContract:
         version=version,
         storage_bucket=storage_bucket,
         storage_key=storage_key,
+        storage_format=storage_format,
     )
 
 
@@ -76,6 +87,33 @@ def ensure_bucket(s3, bucket: str) -> None:
     print(f"Created bucket: {bucket}")
 
 
+def serialize_frame(df: pd.DataFrame, fmt: str, row_group_rows: int) -> bytes:
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if fmt not in STORAGE_FORMATS:
+        raise RuntimeError(
+            f"Invalid storage format {fmt!r}. Use one of: {', '.join(STORAGE_FORMATS)}."
+        )
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "storage.format is parquet/arrow, but pyarrow is not installed in this environment."
+        ) from exc
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink, compression="zstd", row_group_size=row_group_rows)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table, max_chunksize=row_group_rows)
+    return sink.getvalue().to_pybytes()
+
+
 def object_exists(s3, bucket: str, key: str) -> bool:
     try:
         s3.head_object(Bucket=bucket, Key=key)
@@ -104,6 +142,8 @@ def main() -> None:
     contract = load_dataset_contract(contract_path)
     bucket = os.getenv("DATASET_BUCKET", contract.storage_bucket)
     key = os.getenv("DATASET_KEY", contract.storage_key)
+    storage_format = os.getenv("DATASET_FORMAT", contract.storage_format)
+    row_group_rows = int(os.getenv("SEED_ROW_GROUP_ROWS", "100000"))
 
     s3 = boto3.client(
         "s3",
@@ -126,16 +166,16 @@ def main() -> None:
         print("Overwriting existing object.")
 
     df = build_iris_dataframe()
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
+    payload = serialize_frame(df, storage_format, row_group_rows)
     s3.put_object(
         Bucket=bucket,
         Key=key,
-        Body=csv_bytes,
-        ContentType="text/csv",
+        Body=payload,
+        ContentType=CONTENT_TYPES[storage_format],
     )
 
     print(f"Uploaded Iris demo dataset to s3://{bucket}/{key}")
-    print(f"Rows: {len(df)}")
+    print(f"Rows: {len(df)} ({storage_format}, {len(payload)} bytes)")
 
 
 if __name__ == "__main__":
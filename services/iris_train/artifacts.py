@@ -1,49 +1,89 @@
+"""Evaluation artifacts: CSV/JSON/text first, PNG plots optional.
+
+Plots use matplotlib's object-oriented Agg API (no ``pyplot`` import or global
+figure state), so they can render concurrently in threads. Confusion matrices
+with more than ``max_plot_classes`` classes are cut down to the most confused
+classes, and cell annotations are only drawn up to ``annotate_max_classes``.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+from config import ArtifactConfig
 from pipeline import EvaluationResult
 
 
-def _save_confusion_matrix_png(confusion_matrix_values, class_names, path: Path) -> None:
-    fig = plt.figure()
-    plt.imshow(confusion_matrix_values)
-    plt.xticks(range(len(class_names)), class_names, rotation=45, ha="right")
-    plt.yticks(range(len(class_names)), class_names)
-    plt.xlabel("Predicted")
-    plt.ylabel("True")
-
-    for i in range(confusion_matrix_values.shape[0]):
-        for j in range(confusion_matrix_values.shape[1]):
-            plt.text(j, i, str(confusion_matrix_values[i, j]), ha="center", va="center")
-
-    plt.tight_layout()
-    fig.savefig(path, dpi=160)
-    plt.close(fig)
-
-
-def _save_confidence_histogram(y_proba_max, path: Path) -> None:
-    fig = plt.figure()
-    plt.hist(y_proba_max, bins=20)
-    plt.xlabel("Top-1 predicted probability")
-    plt.ylabel("Count")
-    plt.title("Prediction confidence (test set)")
-    plt.tight_layout()
-    fig.savefig(path, dpi=160)
-    plt.close(fig)
-
-
-def write_evaluation_artifacts(result: EvaluationResult, output_dir: str) -> dict[str, str]:
-    artifacts_dir = Path(output_dir)
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
-
-    cm_path = artifacts_dir / "confusion_matrix.png"
-    _save_confusion_matrix_png(result.confusion_matrix, result.class_names, cm_path)
-
-    report_txt_path = artifacts_dir / "classification_report.txt"
-    report_txt_path.write_text(result.classification_report_txt)
-
+def _new_figure(size: tuple[float, float]):
+    # Imported lazily: runs with ARTIFACT_IMAGES=false never pay for matplotlib.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=size)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def most_confused_classes(confusion_matrix_values: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the ``limit`` classes with the most misclassified rows + columns, in order."""
+    errors = confusion_matrix_values.sum(axis=0) + confusion_matrix_values.sum(axis=1)
+    errors = errors - 2 * np.diag(confusion_matrix_values)
+    return np.sort(np.argsort(-errors, kind="stable")[:limit])
+
+
+def _save_confusion_matrix_png(
+    confusion_matrix_values: np.ndarray, class_names: list, path: Path, cfg: ArtifactConfig
+) -> None:
+    n_total = len(class_names)
+    title = None
+    if n_total > cfg.max_plot_classes:
+        keep = most_confused_classes(confusion_matrix_values, cfg.max_plot_classes)
+        confusion_matrix_values = confusion_matrix_values[np.ix_(keep, keep)]
+        class_names = [class_names[i] for i in keep]
+        title = f"{len(keep)} most confused of {n_total} classes"
+
+    n = len(class_names)
+    side = min(4.8 + 0.18 * n, 24.0)
+    fig = _new_figure((side, side))
+    ax = fig.add_subplot()
+    image = ax.imshow(confusion_matrix_values, interpolation="nearest")
+    ax.set_xticks(np.arange(n), labels=[str(c) for c in class_names], rotation=45, ha="right")
+    ax.set_yticks(np.arange(n), labels=[str(c) for c in class_names])
+    ax.set_xlabel("Predicted")
+    ax.set_ylabel("True")
+    if title:
+        ax.set_title(title)
+
+    if n <= cfg.annotate_max_classes:
+        # Labels and contrast colours are vectorized; matplotlib still draws one Text
+        # artist per cell, which annotate_max_classes keeps bounded.
+        rows, cols = np.indices(confusion_matrix_values.shape).reshape(2, -1)
+        values = confusion_matrix_values[rows, cols]
+        labels = values.astype(str)
+        colors = np.where(image.norm(values) < 0.5, "white", "black")
+        for i, j, label, color in zip(rows.tolist(), cols.tolist(), labels, colors):
+            ax.text(j, i, label, ha="center", va="center", color=color, fontsize="small")
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=cfg.dpi)
+
+
+def _save_confidence_histogram(y_proba_max: np.ndarray, path: Path, cfg: ArtifactConfig) -> None:
+    counts, edges = np.histogram(y_proba_max, bins=20)
+    fig = _new_figure((6.4, 4.8))
+    ax = fig.add_subplot()
+    ax.stairs(counts, edges, fill=True)
+    ax.set_xlabel("Top-1 predicted probability")
+    ax.set_ylabel("Count")
+    ax.set_title("Prediction confidence (test set)")
+    fig.tight_layout()
+    fig.savefig(path, dpi=cfg.dpi)
+
+
+def _per_class_metrics(result: EvaluationResult) -> pd.DataFrame:
     per_class_rows = []
     for class_name in result.class_names:
         row = result.classification_report_dict.get(str(class_name))
@@ -51,20 +91,58 @@ def write_evaluation_artifacts(result: EvaluationResult, output_dir: str) -> dic
             row = result.classification_report_dict.get(class_name)
         if row:
             per_class_rows.append({"class": class_name, **row})
+    return pd.DataFrame(per_class_rows)
+
+
+def write_evaluation_artifacts(result: EvaluationResult, cfg: ArtifactConfig) -> dict[str, str]:
+    artifacts_dir = Path(cfg.output_dir)
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+
+    report_txt_path = artifacts_dir / "classification_report.txt"
+    report_txt_path.write_text(result.classification_report_txt)
+
+    report_json_path = artifacts_dir / "classification_report.json"
+    report_json_path.write_text(json.dumps(result.classification_report_dict, default=float))
 
-    per_class_df = pd.DataFrame(per_class_rows)
     per_class_csv_path = artifacts_dir / "per_class_metrics.csv"
-    per_class_df.to_csv(per_class_csv_path, index=False)
+    _per_class_metrics(result).to_csv(per_class_csv_path, index=False)
+
+    labels = [str(c) for c in result.class_names]
+    cm_csv_path = artifacts_dir / "confusion_matrix.csv"
+    pd.DataFrame(result.confusion_matrix, index=labels, columns=labels).to_csv(
+        cm_csv_path, index_label="true\\predicted"
+    )
 
     paths = {
-        "confusion_matrix": str(cm_path),
         "classification_report": str(report_txt_path),
+        "classification_report_json": str(report_json_path),
         "per_class_metrics": str(per_class_csv_path),
+        "confusion_matrix_csv": str(cm_csv_path),
+    }
+    if not cfg.render_images:
+        return paths
+
+    renders = {
+        "confusion_matrix": (
+            _save_confusion_matrix_png,
+            (result.confusion_matrix, result.class_names),
+            artifacts_dir / "confusion_matrix.png",
+        )
     }
-
     if result.y_proba_max is not None:
-        hist_path = artifacts_dir / "confidence_hist.png"
-        _save_confidence_histogram(result.y_proba_max, hist_path)
-        paths["confidence_histogram"] = str(hist_path)
+        renders["confidence_histogram"] = (
+            _save_confidence_histogram,
+            (result.y_proba_max,),
+            artifacts_dir / "confidence_hist.png",
+        )
+
+    with ThreadPoolExecutor(max_workers=len(renders)) as pool:
+        futures = {
+            name: pool.submit(render, *args, path, cfg)
+            for name, (render, args, path) in renders.items()
+        }
+        for name, future in futures.items():
+            future.result()
+            paths[name] = str(renders[name][2])
 
     return paths
@@ -0,0 +1,225 @@
+"""Offline batch scoring: feature table -> serving predictions table.
+
+Rows are streamed in ``row_id`` order with a server-side cursor, scored on a
+process pool (the model is loaded once and shipped to each worker) and
+COPY'd chunk by chunk in order. Each chunk is committed, so a rerun resumes
+after the highest ``row_id`` already written for the same model version.
+"""
+
+import csv
+import io
+import logging
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from config import BatchScoringConfig
+from data_sources import PostgresFeatureSource, safe_schema_table
+
+try:
+    from model_registry import get_model_version, parse_registry_uri
+except ModuleNotFoundError:
+    # Images copy model_registry.py next to the service; local runs use services/common.
+    sys.path.append(str(Path(__file__).resolve().parent.parent / "common"))
+    from model_registry import get_model_version, parse_registry_uri
+
+logger = logging.getLogger("iris_batch_score")
+
+_WORKER_MODEL = None
+
+
+def _setup_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s | %(message)s",
+    )
+
+
+def resolve_model_version(tracking_uri: str, model_uri: str) -> tuple[str, str]:
+    """Pin ``models:/<name>/<version|latest|stage>`` or ``models:/<name>@<alias>``."""
+    from mlflow.tracking import MlflowClient
+
+    parsed = parse_registry_uri(model_uri)
+    if parsed is None:
+        raise RuntimeError(f"MODEL_URI must be a registry URI (models:/...), got: {model_uri!r}")
+
+    name, alias, ref = parsed
+    if ref is not None and ref.isdigit():
+        return name, ref
+
+    client = MlflowClient(tracking_uri=tracking_uri)
+    return name, str(get_model_version(client, name, alias, ref).version)
+
+
+def scoring_columns(model, configured: list[str]) -> list[str]:
+    """Feature columns in the order the model was fit on.
+
+    Chunks are scored as plain arrays, so the column order must match the fit
+    order; a model fit on a different set of columns is rejected outright.
+    """
+    fitted = getattr(model, "feature_names_in_", None)
+    if fitted is None:
+        return list(configured)
+    fitted = [str(c) for c in fitted]
+    if sorted(fitted) != sorted(configured):
+        raise RuntimeError(
+            f"Model was fit on columns {fitted}, but FEATURE_COLUMNS is {list(configured)}."
+        )
+    return fitted
+
+
+def _init_worker(model) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+    # Columns are fed in the fit order (see scoring_columns); only the names are missing.
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def score_chunk(
+    row_ids: np.ndarray, features: np.ndarray, model_name: str, model_version: str
+) -> str:
+    """Score one chunk and render it as CSV rows for COPY."""
+    predictions = _WORKER_MODEL.predict(features).tolist()
+    if hasattr(_WORKER_MODEL, "predict_proba"):
+        probabilities = [
+            "{" + ",".join(map(repr, row)) + "}"
+            for row in _WORKER_MODEL.predict_proba(features).tolist()
+        ]
+    else:
+        probabilities = repeat("")
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        zip(row_ids.tolist(), repeat(model_name), repeat(model_version), predictions, probabilities)
+    )
+    return buffer.getvalue()
+
+
+def _copy_chunk(raw_conn, output_table: str, payload: str) -> None:
+    schema, table = safe_schema_table(output_table)
+    with raw_conn.cursor() as cur:
+        cur.copy_expert(
+            f'COPY "{schema}"."{table}" '
+            "(row_id, model_name, model_version, prediction, probabilities) "
+            "FROM STDIN WITH (FORMAT csv)",
+            io.StringIO(payload),
+        )
+    raw_conn.commit()
+
+
+def prepare_range(
+    engine, cfg: BatchScoringConfig, model_name: str, model_version: str
+) -> int | None:
+    """Exclusive lower ``row_id`` bound for this run; clears the range unless resuming."""
+    schema, table = safe_schema_table(cfg.output_table)
+    after_row_id = cfg.start_row_id - 1 if cfg.start_row_id is not None else None
+    params = {
+        "model_name": model_name,
+        "model_version": model_version,
+        "after_row_id": after_row_id,
+        "until_row_id": cfg.end_row_id,
+    }
+    scope = (
+        "model_name = :model_name AND model_version = :model_version "
+        "AND (CAST(:after_row_id AS BIGINT) IS NULL OR row_id > :after_row_id) "
+        "AND (CAST(:until_row_id AS BIGINT) IS NULL OR row_id <= :until_row_id)"
+    )
+
+    with engine.begin() as conn:
+        if cfg.resume:
+            scored_until = conn.execute(
+                text(f'SELECT max(row_id) FROM "{schema}"."{table}" WHERE {scope}'), params
+            ).scalar()
+            if scored_until is not None:
+                logger.info("Resuming after row_id=%s", scored_until)
+                return int(scored_until)
+        else:
+            deleted = conn.execute(text(f'DELETE FROM "{schema}"."{table}" WHERE {scope}'), params)
+            logger.info("Cleared %s previously scored rows in range", deleted.rowcount)
+    return after_row_id
+
+
+def main() -> None:
+    _setup_logging()
+    cfg = BatchScoringConfig.from_env()
+    if cfg.chunk_rows <= 0 or cfg.workers <= 0:
+        raise RuntimeError("SCORE_CHUNK_ROWS and SCORE_WORKERS must be > 0.")
+
+    import mlflow.sklearn
+
+    model_name, model_version = resolve_model_version(cfg.tracking_uri, cfg.model_uri)
+    mlflow.set_tracking_uri(cfg.tracking_uri)
+    started = time.perf_counter()
+    model = mlflow.sklearn.load_model(f"models:/{model_name}/{model_version}")
+    logger.info(
+        "Loaded %s version %s in %.2fs", model_name, model_version, time.perf_counter() - started
+    )
+
+    feature_columns = scoring_columns(model, cfg.feature_columns)
+    if feature_columns != list(cfg.feature_columns):
+        logger.info("Reading features in the model's fit order: %s", feature_columns)
+
+    engine = create_engine(cfg.postgres.sqlalchemy_url)
+    after_row_id = prepare_range(engine, cfg, model_name, model_version)
+    source = PostgresFeatureSource(cfg.postgres, cfg.feature_table)
+    chunks = source.iter_chunks(
+        feature_columns,
+        cfg.chunk_rows,
+        after_row_id=after_row_id,
+        until_row_id=cfg.end_row_id,
+    )
+
+    started = time.perf_counter()
+    total_rows = 0
+    raw_conn = engine.raw_connection()
+    pending: deque[tuple[int, int, Future]] = deque()
+
+    def write_next() -> None:
+        nonlocal total_rows
+        last_row_id, n_rows, future = pending.popleft()
+        _copy_chunk(raw_conn, cfg.output_table, future.result())
+        total_rows += n_rows
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Scored %s rows up to row_id=%s (%.0f rows/s)",
+            total_rows,
+            last_row_id,
+            total_rows / elapsed if elapsed else 0.0,
+        )
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=cfg.workers, initializer=_init_worker, initargs=(model,)
+        ) as pool:
+            for row_ids, features in chunks:
+                future = pool.submit(score_chunk, row_ids, features, model_name, model_version)
+                pending.append((int(row_ids[-1]), len(row_ids), future))
+                # Bound in-flight chunks; writes stay in row_id order for resumability.
+                if len(pending) >= 2 * cfg.workers:
+                    write_next()
+            while pending:
+                write_next()
+    finally:
+        raw_conn.close()
+        source.close()
+        engine.dispose()
+
+    logger.info(
+        "Batch scoring complete: %s rows into %s with %s version %s in %.2fs",
+        total_rows,
+        cfg.output_table,
+        model_name,
+        model_version,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
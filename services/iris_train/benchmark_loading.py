@@ -0,0 +1,112 @@
+"""Benchmark feature loading: pandas ``read_sql`` vs. projected binary COPY.
+
+Fills ``features._bench_features`` with BENCH_ROWS synthetic rows (server-side,
+via generate_series) and loads it with each mode in a fresh subprocess so the
+reported peak RSS belongs to that mode alone. Run inside the iris_train
+container, e.g.:
+
+    docker compose run --rm -e BENCH_ROWS=10000000 iris_train python benchmark_loading.py
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from config import PostgresConfig
+from data_sources import PostgresFeatureSource
+
+BENCH_TABLE = "features._bench_features"
+BENCH_MODES = ("pandas", "copy_binary")
+FEATURE_COLUMNS = ["f1", "f2", "f3", "f4"]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+def create_bench_table(pg: PostgresConfig, n_rows: int) -> None:
+    engine = create_engine(pg.sqlalchemy_url)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(
+            text(
+                f"""
+                CREATE UNLOGGED TABLE {BENCH_TABLE} AS
+                SELECT
+                  g AS row_id,
+                  random() AS f1,
+                  random() AS f2,
+                  random() AS f3,
+                  random() AS f4,
+                  (g % 3)::INT AS target
+                FROM generate_series(1, :n_rows) AS g
+                """
+            ),
+            {"n_rows": n_rows},
+        )
+    engine.dispose()
+
+
+def _run_mode(pg: PostgresConfig, mode: str, queue) -> None:
+    baseline_mb = _peak_rss_mb()
+    source = PostgresFeatureSource(pg, BENCH_TABLE)
+    started = time.perf_counter()
+    if mode == "pandas":
+        df = source.load()
+        X = df.drop(columns=["row_id", "target"])
+        n_rows = len(X)
+    else:
+        arrays = source.load_arrays(FEATURE_COLUMNS, "target")
+        n_rows = len(arrays.y)
+    seconds = time.perf_counter() - started
+    source.close()
+    queue.put(
+        {
+            "mode": mode,
+            "rows": n_rows,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(n_rows / seconds) if seconds else None,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "peak_rss_delta_mb": round(_peak_rss_mb() - baseline_mb, 1),
+        }
+    )
+
+
+def main() -> None:
+    pg = PostgresConfig.from_env()
+    n_rows = int(os.getenv("BENCH_ROWS", "10000000"))
+    modes = [m for m in os.getenv("BENCH_MODES", ",".join(BENCH_MODES)).split(",") if m]
+
+    print(f"Creating {BENCH_TABLE} with {n_rows} rows")
+    create_bench_table(pg, n_rows)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for mode in modes:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_mode, args=(pg, mode, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        results.append(result)
+        print(
+            f"{mode:>12}: {result['seconds']:>8.2f}s  {result['rows_per_sec']:>12,} rows/s"
+            f"  peak RSS {result['peak_rss_mb']:>8.1f} MiB"
+        )
+
+    output_path = os.getenv("BENCH_OUTPUT")
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
 
 
 def _required_env(name: str) -> str:
@@ -14,6 +17,28 @@ def _parse_csv_env(name: str, default: str) -> list[str]:
     return [item.strip() for item in raw.split(",") if item.strip()]
 
 
+def _contract_path(dataset_name: str) -> Path:
+    explicit_path = os.getenv("DATASET_CONFIG_PATH")
+    if explicit_path:
+        return Path(explicit_path)
+    return Path(f"/datasets/{dataset_name}/config.yaml")
+
+
+def load_contract_training_block(dataset_name: str, required: bool = True) -> dict:
+    path = _contract_path(dataset_name)
+    if not path.is_file():
+        if not required:
+            return {}
+        raise RuntimeError(f"Dataset config not found: {path}")
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    return raw.get("training") or {}
+
+
+def _optional_int_env(name: str) -> int | None:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else None
+
+
 @dataclass(frozen=True)
 class PostgresConfig:
     host: str
@@ -29,6 +54,16 @@ class PostgresConfig:
             f"@{self.host}:{self.port}/{self.database}"
         )
 
+    @classmethod
+    def from_env(cls) -> "PostgresConfig":
+        return cls(
+            host=os.getenv("POSTGRES_HOST", "postgres"),
+            port=int(os.getenv("POSTGRES_PORT", "5432")),
+            user=_required_env("POSTGRES_USER"),
+            password=_required_env("POSTGRES_PASSWORD"),
+            database=_required_env("POSTGRES_DB"),
+        )
+
 
 @dataclass(frozen=True)
 class DataConfig:
@@ -37,6 +72,9 @@ class DataConfig:
     feature_table: str
     target_column: str
     drop_columns: list[str]
+    feature_columns: list[str]
+    load_mode: str
+    load_chunk_rows: int
 
 
 @dataclass(frozen=True)
@@ -49,6 +87,45 @@ class SplitConfig:
 class ModelConfig:
     max_iter: int
     solver: str
+    model_type: str = "logistic_regression"
+    # Extra estimator parameters from training.params in the dataset contract.
+    params: dict = field(default_factory=dict)
+    out_of_core: bool = False
+    epochs: int = 5
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    enabled: bool
+    strategy: str = "grid"
+    space: dict = field(default_factory=dict)
+    cv_folds: int = 5
+    n_trials: int = 20
+    scoring: str = "f1_macro"
+    workers: int = 1
+    random_state: int = 42
+
+    @classmethod
+    def from_env(cls, dataset_name: str) -> "SearchConfig":
+        if os.getenv("TRAIN_MODE", "single").strip().lower() != "search":
+            return cls(enabled=False)
+
+        search = load_contract_training_block(dataset_name).get("search") or {}
+        space = search.get("space") or {}
+        if not space:
+            raise RuntimeError(
+                "TRAIN_MODE=search needs training.search.space in the dataset config."
+            )
+        return cls(
+            enabled=True,
+            strategy=os.getenv("SEARCH_STRATEGY", str(search.get("strategy", "grid"))),
+            space=dict(space),
+            cv_folds=int(os.getenv("SEARCH_CV_FOLDS", str(search.get("cv_folds", 5)))),
+            n_trials=int(os.getenv("SEARCH_N_TRIALS", str(search.get("n_trials", 20)))),
+            scoring=str(search.get("scoring", "f1_macro")),
+            workers=int(os.getenv("SEARCH_WORKERS", str(os.cpu_count() or 1))),
+            random_state=int(os.getenv("RANDOM_STATE", "42")),
+        )
 
 
 @dataclass(frozen=True)
@@ -56,11 +133,24 @@ class MlflowConfig:
     tracking_uri: str
     experiment: str
     registered_model_name: str
+    async_model_logging: bool = False
 
 
 @dataclass(frozen=True)
 class ArtifactConfig:
     output_dir: str
+    render_images: bool = True
+    dpi: int = 160
+    # Larger confusion matrices are cut to the most confused classes.
+    max_plot_classes: int = 50
+    annotate_max_classes: int = 30
+
+
+@dataclass(frozen=True)
+class SnapshotConfig:
+    cache_dir: str | None
+    max_bytes: int
+    force_refresh: bool
 
 
 @dataclass(frozen=True)
@@ -71,38 +161,94 @@ class TrainingAppConfig:
     model: ModelConfig
     mlflow: MlflowConfig
     artifacts: ArtifactConfig
+    snapshot: SnapshotConfig
+    search: SearchConfig
 
     @classmethod
     def from_env(cls) -> "TrainingAppConfig":
+        dataset_name = os.getenv("DATASET_NAME", "iris")
+        training = load_contract_training_block(dataset_name, required=False)
         return cls(
-            postgres=PostgresConfig(
-                host=os.getenv("POSTGRES_HOST", "postgres"),
-                port=int(os.getenv("POSTGRES_PORT", "5432")),
-                user=_required_env("POSTGRES_USER"),
-                password=_required_env("POSTGRES_PASSWORD"),
-                database=_required_env("POSTGRES_DB"),
-            ),
+            postgres=PostgresConfig.from_env(),
             data=DataConfig(
-                dataset_name=os.getenv("DATASET_NAME", "iris"),
+                dataset_name=dataset_name,
                 dataset_version=os.getenv("DATASET_VERSION", "v1"),
                 feature_table=os.getenv("FEATURE_TABLE", "features.iris_features"),
                 target_column=os.getenv("TARGET_COL", "target"),
                 drop_columns=_parse_csv_env("DROP_COLUMNS", "row_id"),
+                feature_columns=_parse_csv_env("FEATURE_COLUMNS", ""),
+                load_mode=os.getenv("FEATURE_LOAD_MODE", "pandas"),
+                load_chunk_rows=int(os.getenv("FEATURE_LOAD_CHUNK_ROWS", "100000")),
             ),
             split=SplitConfig(
                 test_size=float(os.getenv("TEST_SIZE", "0.2")),
                 random_state=int(os.getenv("RANDOM_STATE", "42")),
             ),
             model=ModelConfig(
-                max_iter=int(os.getenv("MAX_ITER", "1000")),
-                solver=os.getenv("SOLVER", "lbfgs"),
+                max_iter=int(os.getenv("MAX_ITER", str(training.get("max_iter", 1000)))),
+                solver=os.getenv("SOLVER", str(training.get("solver", "lbfgs"))),
+                model_type=os.getenv(
+                    "MODEL_TYPE", str(training.get("model_type", "logistic_regression"))
+                ),
+                params=dict(training.get("params") or {}),
+                out_of_core=os.getenv("TRAIN_OUT_OF_CORE", "false").strip().lower()
+                in {"1", "true", "yes"},
+                epochs=int(os.getenv("TRAIN_EPOCHS", str(training.get("epochs", 5)))),
             ),
             mlflow=MlflowConfig(
                 tracking_uri=_required_env("MLFLOW_TRACKING_URI"),
                 experiment=os.getenv("MLFLOW_EXPERIMENT", "iris"),
                 registered_model_name=os.getenv("REGISTERED_MODEL_NAME", "IrisClassifier"),
+                async_model_logging=os.getenv("MLFLOW_ASYNC_MODEL_LOG", "false").strip().lower()
+                in {"1", "true", "yes"},
             ),
             artifacts=ArtifactConfig(
                 output_dir=os.getenv("ARTIFACT_DIR", "/tmp/artifacts"),
+                render_images=os.getenv("ARTIFACT_IMAGES", "true").strip().lower()
+                in {"1", "true", "yes"},
+                dpi=int(os.getenv("ARTIFACT_DPI", "160")),
+                max_plot_classes=int(os.getenv("ARTIFACT_MAX_PLOT_CLASSES", "50")),
+                annotate_max_classes=int(os.getenv("ARTIFACT_ANNOTATE_MAX_CLASSES", "30")),
+            ),
+            snapshot=SnapshotConfig(
+                cache_dir=os.getenv("FEATURE_SNAPSHOT_DIR") or None,
+                max_bytes=int(os.getenv("FEATURE_SNAPSHOT_MAX_MB", "4096")) * 1024**2,
+                force_refresh=os.getenv("FEATURE_SNAPSHOT_REFRESH", "false").strip().lower()
+                in {"1", "true", "yes"},
+            ),
+            search=SearchConfig.from_env(dataset_name),
+        )
+
+
+@dataclass(frozen=True)
+class BatchScoringConfig:
+    postgres: PostgresConfig
+    tracking_uri: str
+    model_uri: str
+    feature_table: str
+    feature_columns: list[str]
+    output_table: str
+    chunk_rows: int
+    workers: int
+    start_row_id: int | None
+    end_row_id: int | None
+    resume: bool
+
+    @classmethod
+    def from_env(cls) -> "BatchScoringConfig":
+        return cls(
+            postgres=PostgresConfig.from_env(),
+            tracking_uri=_required_env("MLFLOW_TRACKING_URI"),
+            model_uri=os.getenv("MODEL_URI", "models:/IrisClassifier/latest"),
+            feature_table=os.getenv("FEATURE_TABLE", "features.iris_features"),
+            feature_columns=_parse_csv_env(
+                "FEATURE_COLUMNS",
+                "sepal_length_cm,sepal_width_cm,petal_length_cm,petal_width_cm",
             ),
+            output_table=os.getenv("PREDICTIONS_TABLE", "serving.iris_predictions"),
+            chunk_rows=int(os.getenv("SCORE_CHUNK_ROWS", "50000")),
+            workers=int(os.getenv("SCORE_WORKERS", str(os.cpu_count() or 1))),
+            start_row_id=_optional_int_env("SCORE_START_ROW_ID"),
+            end_row_id=_optional_int_env("SCORE_END_ROW_ID"),
+            resume=os.getenv("SCORE_RESUME", "true").strip().lower() in {"1", "true", "yes"},
         )
@@ -1,34 +1,222 @@
 import re
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import Engine, create_engine, inspect, text
+from sqlalchemy.types import Integer, Numeric
 
 from config import PostgresConfig
 
 _IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER_SIZE = len(_COPY_SIGNATURE) + 8
 
 
-def _safe_identifier(identifier: str) -> str:
+def safe_identifier(identifier: str) -> str:
     if not _IDENTIFIER_RE.match(identifier):
         raise ValueError(f"Invalid SQL identifier: {identifier!r}")
     return identifier
 
 
-def _safe_schema_table(schema_table: str) -> tuple[str, str]:
+def safe_schema_table(schema_table: str) -> tuple[str, str]:
     parts = schema_table.split(".")
     if len(parts) != 2:
         raise ValueError(
             f"Invalid feature table {schema_table!r}. Expected format '<schema>.<table>'."
         )
-    return _safe_identifier(parts[0]), _safe_identifier(parts[1])
+    return safe_identifier(parts[0]), safe_identifier(parts[1])
+
+
+@dataclass(frozen=True)
+class FeatureArrays:
+    X: np.ndarray
+    y: np.ndarray
+    feature_columns: list[str]
+
+
+class _Float8CopySink:
+    """File-like target for ``COPY ... TO STDOUT (FORMAT binary)`` of float8 columns.
+
+    Every field is fixed width, so complete rows are decoded with one
+    structured ``np.frombuffer`` per ``chunk_rows`` instead of per value.
+    """
+
+    def __init__(self, n_fields: int, chunk_rows: int) -> None:
+        fields = [("n_fields", ">i2")]
+        for i in range(n_fields):
+            fields += [(f"len{i}", ">i4"), (f"val{i}", ">f8")]
+        self._row_dtype = np.dtype(fields)
+        self._n_fields = n_fields
+        self._flush_bytes = chunk_rows * self._row_dtype.itemsize
+        self._buffer = bytearray()
+        self._header_left: int | None = None
+        self.chunks: list[np.ndarray] = []
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= self._flush_bytes:
+            self._decode()
+
+    def _skip_header(self) -> bool:
+        if self._header_left is None:
+            if len(self._buffer) < _COPY_HEADER_SIZE:
+                return False
+            if bytes(self._buffer[: len(_COPY_SIGNATURE)]) != _COPY_SIGNATURE:
+                raise RuntimeError("Unexpected COPY binary header.")
+            (extension_len,) = struct.unpack_from(">i", self._buffer, _COPY_HEADER_SIZE - 4)
+            del self._buffer[:_COPY_HEADER_SIZE]
+            self._header_left = extension_len
+        skip = min(self._header_left, len(self._buffer))
+        del self._buffer[:skip]
+        self._header_left -= skip
+        return self._header_left == 0
+
+    def _decode(self) -> None:
+        if not self._skip_header():
+            return
+        n_rows = len(self._buffer) // self._row_dtype.itemsize
+        if n_rows == 0:
+            return
+        rows = np.frombuffer(self._buffer, dtype=self._row_dtype, count=n_rows)
+        lengths_ok = all((rows[f"len{i}"] == 8).all() for i in range(self._n_fields))
+        if not lengths_ok or not (rows["n_fields"] == self._n_fields).all():
+            raise RuntimeError(
+                "NULL or non-float8 value in COPY stream; use FEATURE_LOAD_MODE=pandas."
+            )
+        chunk = np.empty((n_rows, self._n_fields), dtype=np.float64)
+        for i in range(self._n_fields):
+            chunk[:, i] = rows[f"val{i}"]
+        self.chunks.append(chunk)
+        del rows
+        del self._buffer[: n_rows * self._row_dtype.itemsize]
+
+    def finish(self) -> np.ndarray:
+        self._decode()
+        if bytes(self._buffer) != b"\xff\xff":
+            raise RuntimeError("Truncated COPY binary stream.")
+        if not self.chunks:
+            return np.empty((0, self._n_fields), dtype=np.float64)
+        return np.concatenate(self.chunks) if len(self.chunks) > 1 else self.chunks[0]
 
 
 class PostgresFeatureSource:
     def __init__(self, pg_config: PostgresConfig, feature_table: str) -> None:
         self._pg_config = pg_config
-        self._schema, self._table = _safe_schema_table(feature_table)
+        self._schema, self._table = safe_schema_table(feature_table)
+        self._engine: Engine | None = None
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = create_engine(self._pg_config.sqlalchemy_url)
+        return self._engine
 
     def load(self) -> pd.DataFrame:
-        engine = create_engine(self._pg_config.sqlalchemy_url)
         query = text(f'SELECT * FROM "{self._schema}"."{self._table}"')
-        return pd.read_sql(query, engine)
+        return pd.read_sql(query, self.engine)
+
+    def fingerprint(self, id_column: str = "row_id") -> dict:
+        """Row count, max id and an order-independent checksum, computed server-side."""
+        id_col = safe_identifier(id_column)
+        query = text(
+            f'SELECT count(*), max(t."{id_col}"), '
+            f"sum(hashtextextended(t::text, 0)::numeric) "
+            f'FROM "{self._schema}"."{self._table}" AS t'
+        )
+        with self.engine.connect() as conn:
+            row_count, max_row_id, checksum = conn.execute(query).one()
+        return {
+            "row_count": int(row_count),
+            "max_row_id": None if max_row_id is None else int(max_row_id),
+            "checksum": None if checksum is None else str(checksum),
+        }
+
+    def resolve_feature_columns(self, target_column: str, drop_columns: list[str]) -> list[str]:
+        excluded = {target_column, *drop_columns}
+        columns = inspect(self.engine).get_columns(self._table, schema=self._schema)
+        return [c["name"] for c in columns if c["name"] not in excluded]
+
+    def load_arrays(
+        self, feature_columns: list[str], target_column: str, chunk_rows: int = 100_000
+    ) -> FeatureArrays:
+        """Fetch only the projected columns as float64 via ``COPY ... (FORMAT binary)``.
+
+        Avoids building per-value Python objects; the target is restored to
+        int64 when the column is an integer type.
+        """
+        columns = [safe_identifier(c) for c in [*feature_columns, target_column]]
+        types = {
+            c["name"]: c["type"]
+            for c in inspect(self.engine).get_columns(self._table, schema=self._schema)
+        }
+        missing = [c for c in columns if c not in types]
+        if missing:
+            raise ValueError(f"Columns {missing} not in {self._schema}.{self._table}")
+        non_numeric = [c for c in columns if not isinstance(types[c], (Integer, Numeric))]
+        if non_numeric:
+            raise RuntimeError(
+                f"Columns {non_numeric} are not numeric; use FEATURE_LOAD_MODE=pandas."
+            )
+
+        select_list = ", ".join(f'"{c}"::float8' for c in columns)
+        sql = (
+            f'COPY (SELECT {select_list} FROM "{self._schema}"."{self._table}") '
+            "TO STDOUT WITH (FORMAT binary)"
+        )
+        sink = _Float8CopySink(len(columns), chunk_rows)
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.copy_expert(sql, sink)
+            conn.commit()
+        finally:
+            conn.close()
+        data = sink.finish()
+
+        X = np.ascontiguousarray(data[:, :-1])
+        y = data[:, -1]
+        if isinstance(types[target_column], Integer):
+            y = y.astype(np.int64)
+        return FeatureArrays(X=X, y=y, feature_columns=list(feature_columns))
+
+    def iter_chunks(
+        self,
+        columns: list[str],
+        chunk_rows: int,
+        after_row_id: int | None = None,
+        until_row_id: int | None = None,
+        id_column: str = "row_id",
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yield ``(row_ids, float64 features)`` in id order via a server-side cursor."""
+        id_col = safe_identifier(id_column)
+        select_list = ", ".join(f'"{c}"' for c in [id_col, *map(safe_identifier, columns)])
+        conditions = []
+        params: dict[str, int] = {}
+        if after_row_id is not None:
+            conditions.append(f'"{id_col}" > :after_row_id')
+            params["after_row_id"] = after_row_id
+        if until_row_id is not None:
+            conditions.append(f'"{id_col}" <= :until_row_id')
+            params["until_row_id"] = until_row_id
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = text(
+            f'SELECT {select_list} FROM "{self._schema}"."{self._table}" '
+            f'{where} ORDER BY "{id_col}"'
+        )
+
+        with self.engine.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, max_row_buffer=chunk_rows
+            ).execute(query, params)
+            for rows in result.partitions(chunk_rows):
+                row_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+                features = np.array([r[1:] for r in rows], dtype=np.float64)
+                yield row_ids, features
+
+    def close(self) -> None:
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
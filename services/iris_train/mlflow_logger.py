@@ -1,11 +1,21 @@
 import json
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 import mlflow
 import mlflow.sklearn
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
 
 from config import MlflowConfig
-from pipeline import EvaluationResult, SplitData
+from models import get_backend
+from pipeline import EvaluationResult
+from search import TrialResult
+
+logger = logging.getLogger("iris_train.mlflow_logger")
 
 
 def configure_mlflow(mlflow_cfg: MlflowConfig) -> None:
@@ -24,54 +34,140 @@ def log_training_run(
     dropped_cols: list[str],
     n_rows: int,
     n_features: int,
-    max_iter: int,
-    solver: str,
+    model_type: str,
+    model_params: dict,
     split_test_size: float,
     split_random_state: int,
-    split_data: SplitData,
+    n_train: int,
+    n_test: int,
     evaluation: EvaluationResult,
-    artifact_paths: dict[str, str],
-) -> None:
+    artifact_dir: str,
+    trials: list[TrialResult] | None = None,
+    search_scoring: str | None = None,
+    extra_metrics: dict[str, float] | None = None,
+) -> Future | None:
+    """Log the run with one batched call per entity set and one artifact upload.
+
+    With ``mlflow_cfg.async_model_logging`` the model upload and registration
+    start in a background thread before anything else is logged; the returned
+    future must be awaited before exiting.
+    """
     run_started_at = datetime.now(timezone.utc)
     run_name = (
         f"{dataset_name}__{mlflow_cfg.experiment}__"
         f"{run_started_at.strftime('%Y-%m-%dT%H-%M-%SZ')}"
     )
 
-    with mlflow.start_run(run_name=run_name):
-        mlflow.set_tags(
-            {
-                "dataset": dataset_name,
-                "dataset_version": dataset_version,
-                "pipeline_stage": "training",
-                "last_updated_at": run_started_at.isoformat(),
-            }
+    params = {
+        "feature_table": feature_table,
+        "target_col": target_col,
+        "dropped_cols": json.dumps(dropped_cols),
+        "test_size": split_test_size,
+        "random_state": split_random_state,
+        "model": get_backend(model_type).label,
+        "model_type": model_type,
+        "n_rows": int(n_rows),
+        "n_features": int(n_features),
+    }
+    # Estimator params keep their names (max_iter, solver, ...) unless they clash.
+    run_param_keys = set(params)
+    for key, value in model_params.items():
+        params[f"model_{key}" if key in run_param_keys else key] = value
+    metrics = {
+        "accuracy": evaluation.accuracy,
+        "f1_macro": evaluation.f1_macro,
+        "n_train": int(n_train),
+        "n_test": int(n_test),
+        **(extra_metrics or {}),
+    }
+    tags = {
+        "dataset": dataset_name,
+        "dataset_version": dataset_version,
+        "pipeline_stage": "training",
+        "last_updated_at": run_started_at.isoformat(),
+    }
+    if trials:
+        scoring = search_scoring or "score"
+        tags["search_trials"] = len(trials)
+        metrics[f"best_cv_{scoring}"] = trials[0].cv_mean
+
+    client = MlflowClient()
+    model_logging: Future | None = None
+    with mlflow.start_run(run_name=run_name) as run:
+        run_id = run.info.run_id
+        if mlflow_cfg.async_model_logging:
+            # Started first: the upload overlaps the logging below and the rest of the job.
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlflow-model")
+            model_logging = executor.submit(
+                _log_model_to_run, run_id, model, mlflow_cfg.registered_model_name
+            )
+            executor.shutdown(wait=False)
+            logger.info("Model logging for run %s continues in the background", run_id)
+        with _phase("params/metrics/tags"):
+            log_batch(client, run_id, params=params, metrics=metrics, tags=tags)
+        with _phase("artifacts"):
+            mlflow.log_artifacts(artifact_dir, artifact_path="eval")
+        if trials:
+            with _phase(f"search trials ({len(trials)})"):
+                _log_search_trials(client, trials, scoring)
+        if model_logging is None:
+            with _phase("model"):
+                _log_model(model, mlflow_cfg.registered_model_name)
+    return model_logging
+
+
+@contextmanager
+def _phase(name: str):
+    started = time.perf_counter()
+    yield
+    logger.info("MLflow %s logged in %.3fs", name, time.perf_counter() - started)
+
+
+def log_batch(
+    client: MlflowClient,
+    run_id: str,
+    params: dict | None = None,
+    metrics: dict | None = None,
+    tags: dict | None = None,
+) -> None:
+    now_ms = int(time.time() * 1000)
+    param_items = [Param(k, str(v)) for k, v in (params or {}).items()]
+    metric_items = [Metric(k, float(v), now_ms, 0) for k, v in (metrics or {}).items()]
+    tag_items = [RunTag(k, str(v)) for k, v in (tags or {}).items()]
+    # The tracking server caps a batch at 100 params, 100 tags and 1000 entities.
+    while param_items or metric_items or tag_items:
+        client.log_batch(
+            run_id, metrics=metric_items[:800], params=param_items[:100], tags=tag_items[:100]
         )
-        mlflow.log_param("feature_table", feature_table)
-        mlflow.log_param("target_col", target_col)
-        mlflow.log_param("dropped_cols", json.dumps(dropped_cols))
-        mlflow.log_param("test_size", split_test_size)
-        mlflow.log_param("random_state", split_random_state)
-        mlflow.log_param("model", "LogisticRegression")
-        mlflow.log_param("max_iter", max_iter)
-        mlflow.log_param("solver", solver)
-        mlflow.log_param("n_rows", int(n_rows))
-        mlflow.log_param("n_features", int(n_features))
-
-        mlflow.log_metric("accuracy", evaluation.accuracy)
-        mlflow.log_metric("f1_macro", evaluation.f1_macro)
-        mlflow.log_metric("n_train", int(len(split_data.X_train)))
-        mlflow.log_metric("n_test", int(len(split_data.X_test)))
-
-        mlflow.log_artifact(artifact_paths["confusion_matrix"], artifact_path="eval")
-        mlflow.log_artifact(artifact_paths["classification_report"], artifact_path="eval")
-        mlflow.log_artifact(artifact_paths["per_class_metrics"], artifact_path="eval")
-
-        if "confidence_histogram" in artifact_paths:
-            mlflow.log_artifact(artifact_paths["confidence_histogram"], artifact_path="eval")
-
-        mlflow.sklearn.log_model(
-            model,
-            name="model",
-            registered_model_name=mlflow_cfg.registered_model_name,
+        param_items, metric_items, tag_items = (
+            param_items[100:],
+            metric_items[800:],
+            tag_items[100:],
         )
+
+
+def _log_model(model, registered_model_name: str) -> None:
+    mlflow.sklearn.log_model(model, name="model", registered_model_name=registered_model_name)
+
+
+def _log_model_to_run(run_id: str, model, registered_model_name: str) -> None:
+    # The active-run stack is thread-local, so the run is opened again in this thread.
+    with _phase("model (background)"), mlflow.start_run(run_id=run_id):
+        _log_model(model, registered_model_name)
+
+
+def _log_search_trials(client: MlflowClient, trials: list[TrialResult], scoring: str) -> None:
+    """Log each candidate as a nested run under the active (best model) run."""
+    for trial in trials:
+        with mlflow.start_run(run_name=f"trial-{trial.index:03d}", nested=True) as trial_run:
+            log_batch(
+                client,
+                trial_run.info.run_id,
+                params=trial.params,
+                metrics={
+                    f"cv_{scoring}_mean": trial.cv_mean,
+                    f"cv_{scoring}_std": trial.cv_std,
+                    "fit_seconds": trial.fit_seconds,
+                },
+                tags={"pipeline_stage": "search_trial"},
+            )
@@ -0,0 +1,97 @@
+"""Model backends selectable via ``training.model_type`` / ``MODEL_TYPE``.
+
+Each backend turns the configured defaults plus overrides (contract
+``training.params``, search candidates) into an estimator. ``incremental``
+backends are sklearn pipelines whose steps all support ``partial_fit`` and
+can be trained out-of-core over streamed feature chunks.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from config import ModelConfig
+
+
+@dataclass(frozen=True)
+class ModelBackend:
+    name: str
+    label: str
+    defaults: Callable[[ModelConfig], dict]
+    factory: Callable[..., object]
+    incremental: bool = False
+
+    def params(self, model_cfg: ModelConfig, overrides: dict | None = None) -> dict:
+        return {**self.defaults(model_cfg), **model_cfg.params, **(overrides or {})}
+
+    def build(self, model_cfg: ModelConfig, overrides: dict | None = None):
+        return self.factory(**self.params(model_cfg, overrides))
+
+
+def _sgd_pipeline(**params) -> Pipeline:
+    return Pipeline([("scale", StandardScaler()), ("clf", SGDClassifier(**params))])
+
+
+MODEL_BACKENDS = {
+    backend.name: backend
+    for backend in (
+        ModelBackend(
+            name="logistic_regression",
+            label="LogisticRegression",
+            defaults=lambda cfg: {"max_iter": cfg.max_iter, "solver": cfg.solver},
+            factory=LogisticRegression,
+        ),
+        ModelBackend(
+            name="sgd_classifier",
+            label="SGDClassifier",
+            defaults=lambda cfg: {"loss": "log_loss", "alpha": 1e-4, "random_state": 42},
+            factory=_sgd_pipeline,
+            incremental=True,
+        ),
+        ModelBackend(
+            # Histogram binning + OpenMP: fits on all cores.
+            name="hist_gradient_boosting",
+            label="HistGradientBoostingClassifier",
+            defaults=lambda cfg: {"max_iter": 200, "learning_rate": 0.1, "random_state": 42},
+            factory=HistGradientBoostingClassifier,
+        ),
+    )
+}
+
+
+def get_backend(model_type: str) -> ModelBackend:
+    try:
+        return MODEL_BACKENDS[model_type]
+    except KeyError:
+        raise RuntimeError(
+            f"Invalid model_type {model_type!r}. Use one of: {', '.join(MODEL_BACKENDS)}."
+        ) from None
+
+
+def fit_incremental(
+    model: Pipeline,
+    chunks: Callable[[], Iterable[tuple[object, np.ndarray]]],
+    classes: np.ndarray,
+    epochs: int,
+) -> Pipeline:
+    """Fit a ``partial_fit`` pipeline with one pass per transformer, then ``epochs`` passes."""
+    transformers = [step for _, step in model.steps[:-1]]
+    estimator = model.steps[-1][1]
+
+    def transform(X, upto: int):
+        for step in transformers[:upto]:
+            X = step.transform(X)
+        return X
+
+    for i, step in enumerate(transformers):
+        for X, _ in chunks():
+            step.partial_fit(transform(X, i))
+    for _ in range(epochs):
+        for X, y in chunks():
+            estimator.partial_fit(transform(X, len(transformers)), y, classes=classes)
+    return model
@@ -1,12 +1,13 @@
-from dataclasses import dataclass
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
 from sklearn.model_selection import train_test_split
 
 from config import ModelConfig, SplitConfig
+from models import fit_incremental, get_backend
 
 
 @dataclass(frozen=True)
@@ -53,30 +54,102 @@ def split_dataset(X: pd.DataFrame, y: pd.Series, split_cfg: SplitConfig) -> Spli
     return SplitData(X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test)
 
 
-def train_model(split_data: SplitData, model_cfg: ModelConfig) -> LogisticRegression:
-    model = LogisticRegression(max_iter=model_cfg.max_iter, solver=model_cfg.solver)
+def build_model(model_cfg: ModelConfig, params: dict | None = None):
+    """``params`` (e.g. a search candidate) override the configured settings."""
+    return get_backend(model_cfg.model_type).build(model_cfg, params)
+
+
+def train_model(split_data: SplitData, model_cfg: ModelConfig, params: dict | None = None):
+    model = build_model(model_cfg, params)
     model.fit(split_data.X_train, split_data.y_train)
     return model
 
 
-def evaluate_model(model: LogisticRegression, split_data: SplitData) -> EvaluationResult:
-    y_pred = model.predict(split_data.X_test)
-    class_names = sorted(pd.unique(split_data.y_test))
+@dataclass(frozen=True)
+class TrainedModel:
+    model: object
+    X_test: pd.DataFrame
+    y_test: pd.Series
+    n_train: int
+    # Overrides picked by a hyperparameter search, and its trials.
+    best_params: dict = field(default_factory=dict)
+    trials: list | None = None
+
+
+def _as_labels(y: np.ndarray) -> np.ndarray:
+    return y.astype(np.int64) if np.all(np.mod(y, 1) == 0) else y
+
+
+def train_out_of_core(
+    chunks: Callable[[], Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]],
+    feature_columns: list[str],
+    target_column: str,
+    model_cfg: ModelConfig,
+    split_cfg: SplitConfig,
+    params: dict | None = None,
+) -> TrainedModel:
+    """Train an incremental backend over ``(row_ids, X, y)`` chunks without loading the table.
+
+    Rows are assigned to the test split by a hash of ``row_id`` (stable across
+    passes); only the test rows are kept in memory for evaluation.
+    """
+    backend = get_backend(model_cfg.model_type)
+    if not backend.incremental:
+        raise RuntimeError(f"model_type {backend.name!r} does not support TRAIN_OUT_OF_CORE.")
+
+    threshold = np.uint64(int(split_cfg.test_size * 2**32))
+    salt = np.uint64(split_cfg.random_state)
+
+    def is_test(row_ids: np.ndarray) -> np.ndarray:
+        hashed = ((row_ids.astype(np.uint64) + salt) * np.uint64(2654435761)) % np.uint64(2**32)
+        return hashed < threshold
+
+    test_X: list[np.ndarray] = []
+    test_y: list[np.ndarray] = []
+    classes: set = set()
+    n_train = 0
+    for row_ids, X, y in chunks():
+        mask = is_test(row_ids)
+        test_X.append(X[mask])
+        test_y.append(_as_labels(y[mask]))
+        classes.update(np.unique(_as_labels(y)).tolist())
+        n_train += int((~mask).sum())
+
+    def train_chunks():
+        for row_ids, X, y in chunks():
+            mask = ~is_test(row_ids)
+            yield pd.DataFrame(X[mask], columns=feature_columns), _as_labels(y[mask])
+
+    model = fit_incremental(
+        backend.build(model_cfg, params),
+        train_chunks,
+        classes=np.array(sorted(classes)),
+        epochs=model_cfg.epochs,
+    )
+    return TrainedModel(
+        model=model,
+        X_test=pd.DataFrame(np.concatenate(test_X), columns=feature_columns),
+        y_test=pd.Series(np.concatenate(test_y), name=target_column),
+        n_train=n_train,
+    )
+
+
+def evaluate_model(model, X_test: pd.DataFrame, y_test: pd.Series) -> EvaluationResult:
+    y_pred = model.predict(X_test)
+    class_names = sorted(pd.unique(y_test))
 
     y_proba_max = None
     if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(split_data.X_test)
+        proba = model.predict_proba(X_test)
         y_proba_max = np.max(proba, axis=1)
 
     return EvaluationResult(
-        accuracy=float(accuracy_score(split_data.y_test, y_pred)),
-        f1_macro=float(f1_score(split_data.y_test, y_pred, average="macro")),
-        confusion_matrix=confusion_matrix(split_data.y_test, y_pred, labels=class_names),
-        classification_report_txt=classification_report(
-            split_data.y_test, y_pred, zero_division=0
-        ),
+        accuracy=float(accuracy_score(y_test, y_pred)),
+        f1_macro=float(f1_score(y_test, y_pred, average="macro")),
+        confusion_matrix=confusion_matrix(y_test, y_pred, labels=class_names),
+        classification_report_txt=classification_report(y_test, y_pred, zero_division=0),
         classification_report_dict=classification_report(
-            split_data.y_test, y_pred, output_dict=True, zero_division=0
+            y_test, y_pred, output_dict=True, zero_division=0
         ),
         y_proba_max=y_proba_max,
         class_names=class_names,
@@ -0,0 +1,133 @@
+"""Hyperparameter search over the ``training.search`` space of the dataset contract.
+
+Candidates come from a grid (every value list combined) or a random space
+(lists are sampled uniformly; ``{low, high, log, type}`` mappings become
+continuous or integer distributions). Each candidate is scored with
+stratified k-fold CV on the training split in a process pool. Workers are
+forked after the training matrix is loaded, so they share it copy-on-write
+instead of receiving a pickled copy per task.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform, randint, uniform
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+from config import ModelConfig, SearchConfig
+from pipeline import build_model
+
+SEARCH_STRATEGIES = ("grid", "random")
+
+_SHARED: tuple[pd.DataFrame, pd.Series] | None = None
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    index: int
+    params: dict
+    cv_mean: float
+    cv_std: float
+    fit_seconds: float
+
+
+def _distribution(name: str, spec):
+    if isinstance(spec, list):
+        return spec
+    if not isinstance(spec, dict) or "low" not in spec or "high" not in spec:
+        raise RuntimeError(
+            f"Search parameter {name!r} must be a list or a mapping with low/high: {spec!r}"
+        )
+    low, high = spec["low"], spec["high"]
+    if spec.get("type") == "int":
+        return randint(int(low), int(high) + 1)
+    if spec.get("log", False):
+        return loguniform(float(low), float(high))
+    return uniform(float(low), float(high) - float(low))
+
+
+def build_candidates(search_cfg: SearchConfig) -> list[dict]:
+    if search_cfg.strategy not in SEARCH_STRATEGIES:
+        raise RuntimeError(
+            f"Invalid search strategy {search_cfg.strategy!r}. "
+            f"Use one of: {', '.join(SEARCH_STRATEGIES)}."
+        )
+    if search_cfg.strategy == "grid":
+        non_lists = [k for k, v in search_cfg.space.items() if not isinstance(v, list)]
+        if non_lists:
+            raise RuntimeError(f"Grid search needs value lists; got ranges for {non_lists}.")
+        return list(ParameterGrid(search_cfg.space))
+
+    distributions = {k: _distribution(k, v) for k, v in search_cfg.space.items()}
+    sampler = ParameterSampler(
+        distributions, n_iter=search_cfg.n_trials, random_state=search_cfg.random_state
+    )
+    # numpy scalars -> plain Python values for sklearn and MLflow params.
+    return [
+        {k: v.item() if isinstance(v, np.generic) else v for k, v in p.items()} for p in sampler
+    ]
+
+
+def _set_shared(X: pd.DataFrame, y: pd.Series) -> None:
+    global _SHARED
+    _SHARED = (X, y)
+
+
+def _evaluate_candidate(
+    index: int, params: dict, model_cfg: ModelConfig, search_cfg: SearchConfig
+) -> TrialResult:
+    X, y = _SHARED
+    scorer = get_scorer(search_cfg.scoring)
+    folds = StratifiedKFold(
+        n_splits=search_cfg.cv_folds, shuffle=True, random_state=search_cfg.random_state
+    )
+    template = build_model(model_cfg, params)
+
+    started = time.perf_counter()
+    scores = []
+    for train_idx, valid_idx in folds.split(X, y):
+        model = clone(template).fit(X.iloc[train_idx], y.iloc[train_idx])
+        scores.append(scorer(model, X.iloc[valid_idx], y.iloc[valid_idx]))
+    return TrialResult(
+        index=index,
+        params=params,
+        cv_mean=float(np.mean(scores)),
+        cv_std=float(np.std(scores)),
+        fit_seconds=time.perf_counter() - started,
+    )
+
+
+def run_search(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    model_cfg: ModelConfig,
+    search_cfg: SearchConfig,
+) -> list[TrialResult]:
+    """Score every candidate; results are ordered best first."""
+    candidates = build_candidates(search_cfg)
+    if not candidates:
+        raise RuntimeError("Search space produced no candidates.")
+
+    _set_shared(X_train, y_train)
+    if "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+        pool_kwargs = {}
+    else:
+        ctx = multiprocessing.get_context()
+        pool_kwargs = {"initializer": _set_shared, "initargs": (X_train, y_train)}
+
+    workers = max(1, min(search_cfg.workers, len(candidates)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, **pool_kwargs) as pool:
+        futures = [
+            pool.submit(_evaluate_candidate, i, params, model_cfg, search_cfg)
+            for i, params in enumerate(candidates)
+        ]
+        results = [f.result() for f in futures]
+
+    return sorted(results, key=lambda r: (-r.cv_mean, r.cv_std, r.index))
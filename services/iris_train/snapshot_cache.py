@@ -0,0 +1,137 @@
+"""Local feature snapshots, memory-mapped on reuse.
+
+A snapshot is ``X.npy`` + ``y.npy`` + ``meta.json`` in a directory named after
+the table, dataset version, projected columns and a content fingerprint
+(row count, max ``row_id``, checksum). Later runs with the same key ``np.load``
+the arrays with ``mmap_mode="r"`` instead of querying Postgres.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from config import SnapshotConfig
+from data_sources import FeatureArrays
+
+logger = logging.getLogger("iris_train.snapshot_cache")
+
+_META_FILE = "meta.json"
+
+
+def snapshot_key(
+    feature_table: str,
+    dataset_version: str,
+    feature_columns: list[str],
+    target_column: str,
+    fingerprint: dict,
+) -> str:
+    payload = json.dumps(
+        {
+            "feature_table": feature_table,
+            "dataset_version": dataset_version,
+            "feature_columns": feature_columns,
+            "target_column": target_column,
+            "fingerprint": fingerprint,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class FeatureSnapshotCache:
+    def __init__(self, cfg: SnapshotConfig) -> None:
+        if cfg.cache_dir is None:
+            raise RuntimeError("FeatureSnapshotCache requires FEATURE_SNAPSHOT_DIR.")
+        self._root = Path(cfg.cache_dir)
+        self._max_bytes = cfg.max_bytes
+        self._force_refresh = cfg.force_refresh
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _read(self, entry: Path) -> FeatureArrays:
+        meta = json.loads((entry / _META_FILE).read_text(encoding="utf-8"))
+        os.utime(entry / _META_FILE)
+        return FeatureArrays(
+            X=np.load(entry / "X.npy", mmap_mode="r"),
+            y=np.load(entry / "y.npy", mmap_mode="r"),
+            feature_columns=list(meta["feature_columns"]),
+        )
+
+    def _write(self, key: str, arrays: FeatureArrays, meta: dict) -> Path:
+        entry = self._root / key
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self._root))
+        try:
+            np.save(tmp_dir / "X.npy", np.ascontiguousarray(arrays.X))
+            np.save(tmp_dir / "y.npy", np.ascontiguousarray(arrays.y))
+            size_bytes = sum(f.stat().st_size for f in tmp_dir.iterdir())
+            meta = {
+                **meta,
+                "feature_columns": arrays.feature_columns,
+                "rows": int(len(arrays.y)),
+                "size_bytes": size_bytes,
+                "created_at": time.time(),
+            }
+            (tmp_dir / _META_FILE).write_text(json.dumps(meta, default=str), encoding="utf-8")
+            if entry.exists():
+                shutil.rmtree(entry)
+            tmp_dir.rename(entry)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return entry
+
+    def evict(self, keep: Path | None = None) -> None:
+        entries = []
+        for entry in self._root.iterdir():
+            meta_path = entry / _META_FILE
+            if entry.is_dir() and meta_path.exists():
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                entries.append((meta_path.stat().st_mtime, entry, int(meta.get("size_bytes", 0))))
+        entries.sort()
+
+        total = sum(size for _, _, size in entries)
+        for _, entry, size in entries:
+            if total <= self._max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            logger.info("Evicted feature snapshot %s (%s bytes)", entry.name, size)
+
+    def get_or_load(
+        self, key: str, meta: dict, loader: Callable[[], FeatureArrays]
+    ) -> FeatureArrays:
+        entry = self._root / key
+        if (entry / _META_FILE).exists() and not self._force_refresh:
+            started = time.perf_counter()
+            arrays = self._read(entry)
+            logger.info(
+                "Feature snapshot hit %s: %s rows mapped in %.3fs",
+                key,
+                len(arrays.y),
+                time.perf_counter() - started,
+            )
+            return arrays
+
+        started = time.perf_counter()
+        arrays = loader()
+        entry = self._write(key, arrays, meta)
+        self.evict(keep=entry)
+        logger.info(
+            "Feature snapshot %s %s: %s rows loaded and written in %.2fs",
+            "refreshed" if self._force_refresh else "miss",
+            key,
+            len(arrays.y),
+            time.perf_counter() - started,
+        )
+        # Hand out the mapped copy so a miss and a hit behave the same downstream.
+        return self._read(entry)
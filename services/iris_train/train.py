@@ -1,10 +1,33 @@
 import logging
+import sys
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine
 
 from artifacts import write_evaluation_artifacts
-from config import TrainingAppConfig
+from config import DataConfig, SnapshotConfig, TrainingAppConfig
 from data_sources import PostgresFeatureSource
 from mlflow_logger import configure_mlflow, log_training_run
-from pipeline import evaluate_model, prepare_features, split_dataset, train_model
+from models import get_backend
+from pipeline import (
+    TrainedModel,
+    evaluate_model,
+    prepare_features,
+    split_dataset,
+    train_model,
+    train_out_of_core,
+)
+from search import run_search
+from snapshot_cache import FeatureSnapshotCache, snapshot_key
+try:
+    from stage_timing import StageTimer
+except ModuleNotFoundError:
+    # Images copy stage_timing.py next to the service; local runs use services/common.
+    sys.path.append(str(Path(__file__).resolve().parent.parent / "common"))
+    from stage_timing import StageTimer
 
 
 def _setup_logging() -> None:
@@ -14,6 +37,66 @@ def _setup_logging() -> None:
     )
 
 
+FEATURE_LOAD_MODES = ("pandas", "copy_binary")
+
+
+def load_training_data(
+    feature_source: PostgresFeatureSource,
+    data_cfg: DataConfig,
+    snapshot_cfg: SnapshotConfig,
+) -> tuple[pd.DataFrame, pd.Series]:
+    if data_cfg.load_mode not in FEATURE_LOAD_MODES:
+        raise RuntimeError(
+            f"Invalid FEATURE_LOAD_MODE {data_cfg.load_mode!r}. "
+            f"Use one of: {', '.join(FEATURE_LOAD_MODES)}."
+        )
+
+    if data_cfg.load_mode == "pandas":
+        if snapshot_cfg.cache_dir:
+            logging.getLogger("iris_train").warning(
+                "FEATURE_SNAPSHOT_DIR is ignored with FEATURE_LOAD_MODE=pandas."
+            )
+        df = feature_source.load()
+        return prepare_features(
+            df,
+            target_column=data_cfg.target_column,
+            drop_columns=data_cfg.drop_columns,
+        )
+
+    feature_columns = data_cfg.feature_columns or feature_source.resolve_feature_columns(
+        data_cfg.target_column, data_cfg.drop_columns
+    )
+    if not feature_columns:
+        raise ValueError("No feature columns to load. Check FEATURE_COLUMNS/DROP_COLUMNS.")
+
+    def load_arrays():
+        return feature_source.load_arrays(
+            feature_columns, data_cfg.target_column, chunk_rows=data_cfg.load_chunk_rows
+        )
+
+    if snapshot_cfg.cache_dir:
+        fingerprint = feature_source.fingerprint()
+        key = snapshot_key(
+            data_cfg.feature_table,
+            data_cfg.dataset_version,
+            feature_columns,
+            data_cfg.target_column,
+            fingerprint,
+        )
+        meta = {
+            "feature_table": data_cfg.feature_table,
+            "dataset_version": data_cfg.dataset_version,
+            "target_column": data_cfg.target_column,
+            "fingerprint": fingerprint,
+        }
+        arrays = FeatureSnapshotCache(snapshot_cfg).get_or_load(key, meta, load_arrays)
+    else:
+        arrays = load_arrays()
+    X = pd.DataFrame(arrays.X, columns=arrays.feature_columns, copy=False)
+    y = pd.Series(arrays.y, name=data_cfg.target_column)
+    return X, y
+
+
 def main() -> None:
     _setup_logging()
     logger = logging.getLogger("iris_train")
@@ -27,52 +110,162 @@ def main() -> None:
         cfg.mlflow.experiment,
     )
 
-    logger.info("Loading features from table: %s", cfg.data.feature_table)
+    timer = StageTimer.from_env("iris_train", emit=logging.getLogger("iris_train.stages").info)
+    model_logging = None
+    try:
+        model_logging = _run(cfg, timer, logger)
+    finally:
+        engine = create_engine(cfg.postgres.sqlalchemy_url)
+        timer.write_to_postgres(
+            engine,
+            labels={
+                "dataset_name": cfg.data.dataset_name,
+                "dataset_version": cfg.data.dataset_version,
+                "model_type": cfg.model.model_type,
+            },
+        )
+        engine.dispose()
+
+    if model_logging is not None:
+        # Awaited last so the upload overlaps MLflow logging and the Postgres write.
+        started = time.perf_counter()
+        model_logging.result()
+        logger.info("Background model logging done (waited %.2fs)", time.perf_counter() - started)
+
+
+def _run(cfg: TrainingAppConfig, timer: StageTimer, logger) -> Future | None:
+    backend = get_backend(cfg.model.model_type)
     feature_source = PostgresFeatureSource(cfg.postgres, cfg.data.feature_table)
-    df = feature_source.load()
+    try:
+        if cfg.model.out_of_core:
+            trained = _train_out_of_core(cfg, feature_source, timer, logger)
+        else:
+            trained = _train_in_memory(cfg, feature_source, timer, logger)
+    finally:
+        feature_source.close()
 
-    X, y = prepare_features(
-        df,
-        target_column=cfg.data.target_column,
-        drop_columns=cfg.data.drop_columns,
-    )
-    split_data = split_dataset(X, y, cfg.split)
+    with timer.stage("evaluate_model", rows=len(trained.X_test)):
+        evaluation = evaluate_model(trained.model, trained.X_test, trained.y_test)
 
+    with timer.stage("write_evaluation_artifacts"):
+        artifact_paths = write_evaluation_artifacts(evaluation, cfg.artifacts)
     logger.info(
-        "Training model with %s rows (%s train / %s test)",
-        len(df),
-        len(split_data.X_train),
-        len(split_data.X_test),
+        "Wrote %s evaluation artifacts to %s", len(artifact_paths), cfg.artifacts.output_dir
     )
-    model = train_model(split_data, cfg.model)
-    evaluation = evaluate_model(model, split_data)
-
-    artifact_paths = write_evaluation_artifacts(evaluation, cfg.artifacts.output_dir)
 
-    log_training_run(
-        mlflow_cfg=cfg.mlflow,
-        model=model,
-        dataset_name=cfg.data.dataset_name,
-        dataset_version=cfg.data.dataset_version,
-        feature_table=cfg.data.feature_table,
-        target_col=cfg.data.target_column,
-        dropped_cols=[cfg.data.target_column, *cfg.data.drop_columns],
-        n_rows=df.shape[0],
-        n_features=X.shape[1],
-        max_iter=cfg.model.max_iter,
-        solver=cfg.model.solver,
-        split_test_size=cfg.split.test_size,
-        split_random_state=cfg.split.random_state,
-        split_data=split_data,
-        evaluation=evaluation,
-        artifact_paths=artifact_paths,
-    )
+    # Stages finished so far go into the run's metric batch; later ones reach Postgres only.
+    stage_metrics = timer.metrics()
+    with timer.stage("log_training_run"):
+        model_logging = log_training_run(
+            mlflow_cfg=cfg.mlflow,
+            model=trained.model,
+            dataset_name=cfg.data.dataset_name,
+            dataset_version=cfg.data.dataset_version,
+            feature_table=cfg.data.feature_table,
+            target_col=cfg.data.target_column,
+            dropped_cols=[cfg.data.target_column, *cfg.data.drop_columns],
+            n_rows=trained.n_train + len(trained.X_test),
+            n_features=trained.X_test.shape[1],
+            model_type=backend.name,
+            model_params=backend.params(cfg.model, trained.best_params),
+            split_test_size=cfg.split.test_size,
+            split_random_state=cfg.split.random_state,
+            n_train=trained.n_train,
+            n_test=len(trained.X_test),
+            evaluation=evaluation,
+            artifact_dir=cfg.artifacts.output_dir,
+            trials=trained.trials,
+            search_scoring=cfg.search.scoring,
+            extra_metrics=stage_metrics,
+        )
 
     logger.info(
         "Training complete. accuracy=%.4f f1_macro=%.4f",
         evaluation.accuracy,
         evaluation.f1_macro,
     )
+    return model_logging
+
+
+def _train_out_of_core(
+    cfg: TrainingAppConfig, feature_source: PostgresFeatureSource, timer: StageTimer, logger
+) -> TrainedModel:
+    if cfg.search.enabled:
+        raise RuntimeError("TRAIN_MODE=search cannot be combined with TRAIN_OUT_OF_CORE.")
+    feature_columns = cfg.data.feature_columns or feature_source.resolve_feature_columns(
+        cfg.data.target_column, cfg.data.drop_columns
+    )
+    logger.info(
+        "Training %s out-of-core over %s in chunks of %s rows (%s epochs)",
+        cfg.model.model_type,
+        cfg.data.feature_table,
+        cfg.data.load_chunk_rows,
+        cfg.model.epochs,
+    )
+
+    def chunks():
+        # Each epoch re-streams the table; the target rides along as the last column.
+        columns = [*feature_columns, cfg.data.target_column]
+        for row_ids, block in feature_source.iter_chunks(columns, cfg.data.load_chunk_rows):
+            yield row_ids, block[:, :-1], block[:, -1]
+
+    with timer.stage("train_out_of_core") as stage:
+        trained = train_out_of_core(
+            chunks, feature_columns, cfg.data.target_column, cfg.model, cfg.split
+        )
+        stage.rows = trained.n_train + len(trained.X_test)
+    return trained
+
+
+def _train_in_memory(
+    cfg: TrainingAppConfig, feature_source: PostgresFeatureSource, timer: StageTimer, logger
+) -> TrainedModel:
+    logger.info(
+        "Loading features from table: %s (mode=%s)", cfg.data.feature_table, cfg.data.load_mode
+    )
+    with timer.stage("load_features") as stage:
+        X, y = load_training_data(feature_source, cfg.data, cfg.snapshot)
+        stage.rows = len(X)
+    with timer.stage("split_dataset", rows=len(X)):
+        split_data = split_dataset(X, y, cfg.split)
+
+    logger.info(
+        "Training %s with %s rows (%s train / %s test)",
+        cfg.model.model_type,
+        len(X),
+        len(split_data.X_train),
+        len(split_data.X_test),
+    )
+    best_params: dict = {}
+    trials = None
+    if cfg.search.enabled:
+        logger.info(
+            "Running %s search with %s-fold CV on %s workers",
+            cfg.search.strategy,
+            cfg.search.cv_folds,
+            cfg.search.workers,
+        )
+        with timer.stage("search", rows=len(split_data.X_train)):
+            trials = run_search(split_data.X_train, split_data.y_train, cfg.model, cfg.search)
+        best_params = trials[0].params
+        logger.info(
+            "Best of %s candidates: %s=%.4f params=%s",
+            len(trials),
+            cfg.search.scoring,
+            trials[0].cv_mean,
+            best_params,
+        )
+
+    with timer.stage("train_model", rows=len(split_data.X_train)):
+        model = train_model(split_data, cfg.model, best_params)
+    return TrainedModel(
+        model=model,
+        X_test=split_data.X_test,
+        y_test=split_data.y_test,
+        n_train=len(split_data.X_train),
+        best_params=best_params,
+        trials=trials,
+    )
 
 
 if __name__ == "__main__":
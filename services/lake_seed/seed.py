@@ -1,13 +1,24 @@
 import os
+import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
 import boto3
 import pandas as pd
 import yaml
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
 
+STORAGE_FORMATS = ("csv", "parquet", "arrow")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
 def env(name: str, default: str | None = None) -> str:
     value = os.getenv(name, default)
     if not value:
@@ -37,6 +48,7 @@ class DatasetContract:
     version: str
     storage_bucket: str
     storage_key: str
+    storage_format: str = "csv"
 
 
 def resolve_dataset_config_path() -> Path:
@@ -64,6 +76,7 @@ def load_dataset_contract(path: Path) -> DatasetContract:
         version = raw["version"]
         storage_bucket = raw["storage"]["bucket"]
         storage_key = raw["storage"]["key"]
+        storage_format = raw["storage"].get("format", "csv")
     except KeyError as e:
         raise RuntimeError(f"Missing key in dataset config {path}: {e}") from e
 
@@ -72,6 +85,7 @@ def load_dataset_contract(path: Path) -> DatasetContract:
         version=str(version),
         storage_bucket=str(storage_bucket),
         storage_key=str(storage_key),
+        storage_format=str(storage_format),
     )
 
 
@@ -83,6 +97,33 @@ def ensure_bucket(s3, bucket: str) -> None:
     print(f"Created bucket: {bucket}")
 
 
+def serialize_frame(df: pd.DataFrame, fmt: str, row_group_rows: int) -> bytes:
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if fmt not in STORAGE_FORMATS:
+        raise RuntimeError(
+            f"Invalid storage format {fmt!r}. Use one of: {', '.join(STORAGE_FORMATS)}."
+        )
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "storage.format is parquet/arrow, but pyarrow is not installed in this environment."
+        ) from exc
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink, compression="zstd", row_group_size=row_group_rows)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table, max_chunksize=row_group_rows)
+    return sink.getvalue().to_pybytes()
+
+
 def object_exists(s3, bucket: str, key: str) -> bool:
     try:
         s3.head_object(Bucket=bucket, Key=key)
@@ -94,13 +135,151 @@ def object_exists(s3, bucket: str, key: str) -> bool:
         raise
 
 
-def read_local_csv(path_value: str) -> pd.DataFrame:
+def resolve_local_path(path_value: str) -> Path:
     path = Path(path_value)
     if not path.exists():
         raise RuntimeError(f"DATASET_LOCAL_PATH does not exist: {path}")
     if not path.is_file():
         raise RuntimeError(f"DATASET_LOCAL_PATH is not a file: {path}")
-    return pd.read_csv(path)
+    return path
+
+
+def read_local_csv(path_value: str) -> pd.DataFrame:
+    return pd.read_csv(resolve_local_path(path_value))
+
+
+def validate_csv_stream(path: Path, block_size_mb: int) -> int:
+    """Parse the file block by block and return its row count.
+
+    Rows with the wrong field count or values that do not match the column type
+    inferred from earlier blocks raise, and a header without data is rejected.
+    """
+    try:
+        import pyarrow.csv as pa_csv
+    except ImportError as exc:
+        raise RuntimeError("SEED_VALIDATE needs pyarrow installed in this environment.") from exc
+
+    read_options = pa_csv.ReadOptions(block_size=block_size_mb * 1024 * 1024)
+    rows = 0
+    for batch in pa_csv.open_csv(path, read_options=read_options):
+        rows += batch.num_rows
+    if rows == 0:
+        raise RuntimeError(f"{path} contains a header but no data rows.")
+    return rows
+
+
+def convert_csv_stream(path: Path, fmt: str, output_path: Path, row_group_rows: int) -> int:
+    """Convert a local CSV to Parquet/Arrow in ``row_group_rows`` groups; return the row count.
+
+    CSV blocks are buffered until a full row group is available, so at most about
+    one row group is held in memory and the groups match ``serialize_frame``.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "storage.format is parquet/arrow, but pyarrow is not installed in this environment."
+        ) from exc
+
+    rows = 0
+    reader = pa_csv.open_csv(path)
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(output_path, reader.schema, compression="zstd")
+    else:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        writer = pa.ipc.new_file(str(output_path), reader.schema, options=options)
+
+    def write_groups(batches: list) -> None:
+        table = pa.Table.from_batches(batches, schema=reader.schema).combine_chunks()
+        if fmt == "parquet":
+            writer.write_table(table, row_group_size=row_group_rows)
+        else:
+            writer.write_table(table, max_chunksize=row_group_rows)
+
+    pending: list = []
+    pending_rows = 0
+    with writer:
+        for batch in reader:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            rows += batch.num_rows
+            if pending_rows >= row_group_rows:
+                # Write whole row groups; the remainder starts the next one.
+                table = pa.Table.from_batches(pending, schema=reader.schema)
+                full_rows = pending_rows - pending_rows % row_group_rows
+                write_groups(table.slice(0, full_rows).to_batches())
+                rest = table.slice(full_rows)
+                pending, pending_rows = rest.to_batches(), rest.num_rows
+        if pending_rows:
+            write_groups(pending)
+    return rows
+
+
+def upload_file_multipart(
+    s3, path: Path, bucket: str, key: str, content_type: str, part_size_mb: int, max_concurrency: int
+) -> float:
+    """Upload ``path`` in parallel multipart chunks and return the elapsed seconds."""
+    transfer_config = TransferConfig(
+        multipart_threshold=part_size_mb * 1024 * 1024,
+        multipart_chunksize=part_size_mb * 1024 * 1024,
+        max_concurrency=max_concurrency,
+        use_threads=True,
+    )
+    started = time.perf_counter()
+    s3.upload_file(
+        str(path),
+        bucket,
+        key,
+        ExtraArgs={"ContentType": content_type},
+        Config=transfer_config,
+    )
+    return time.perf_counter() - started
+
+
+def stream_seed(
+    s3, local_path: Path, bucket: str, key: str, storage_format: str, row_group_rows: int
+) -> None:
+    if storage_format not in STORAGE_FORMATS:
+        raise RuntimeError(
+            f"Invalid storage format {storage_format!r}. Use one of: {', '.join(STORAGE_FORMATS)}."
+        )
+    part_size_mb = int(os.getenv("SEED_PART_SIZE_MB", "64"))
+    max_concurrency = int(os.getenv("SEED_MAX_CONCURRENCY", "8"))
+
+    rows = None
+    if env_bool("SEED_VALIDATE", default=False):
+        block_size_mb = int(os.getenv("SEED_VALIDATE_BLOCK_MB", "16"))
+        rows = validate_csv_stream(local_path, block_size_mb)
+        print(f"Validated {rows} rows")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_path = local_path
+        if storage_format != "csv":
+            upload_path = Path(tmp_dir) / f"upload.{storage_format}"
+            rows = convert_csv_stream(local_path, storage_format, upload_path, row_group_rows)
+
+        size_bytes = upload_path.stat().st_size
+        seconds = upload_file_multipart(
+            s3,
+            upload_path,
+            bucket,
+            key,
+            content_type=CONTENT_TYPES[storage_format],
+            part_size_mb=part_size_mb,
+            max_concurrency=max_concurrency,
+        )
+
+    throughput = size_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0
+    print(f"Uploaded dataset to s3://{bucket}/{key}")
+    print(f"Source file: {local_path}")
+    print(
+        f"Streamed {size_bytes} bytes ({storage_format}) in {seconds:.2f}s"
+        f" = {throughput:.1f} MiB/s ({part_size_mb} MiB parts x {max_concurrency} threads)"
+    )
+    if rows is not None:
+        print(f"Rows: {rows}")
 
 
 def main() -> None:
@@ -114,7 +293,10 @@ def main() -> None:
 
     bucket = os.getenv("DATASET_BUCKET", contract.storage_bucket)
     key = os.getenv("DATASET_KEY", contract.storage_key)
+    storage_format = os.getenv("DATASET_FORMAT", contract.storage_format)
+    row_group_rows = int(os.getenv("SEED_ROW_GROUP_ROWS", "100000"))
     local_csv_path = env("DATASET_LOCAL_PATH")
+    streaming = env_bool("SEED_STREAMING", default=False)
 
     s3 = boto3.client(
         "s3",
@@ -135,21 +317,28 @@ def main() -> None:
         print("Skipping upload (already exists).")
         return
 
-    df = read_local_csv(local_csv_path)
     if exists and overwrite:
         print("Overwriting existing object.")
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
+
+    if streaming:
+        stream_seed(
+            s3, resolve_local_path(local_csv_path), bucket, key, storage_format, row_group_rows
+        )
+        return
+
+    df = read_local_csv(local_csv_path)
+    payload = serialize_frame(df, storage_format, row_group_rows)
 
     s3.put_object(
         Bucket=bucket,
         Key=key,
-        Body=csv_bytes,
-        ContentType="text/csv",
+        Body=payload,
+        ContentType=CONTENT_TYPES[storage_format],
     )
 
     print(f"Uploaded dataset to s3://{bucket}/{key}")
     print(f"Source file: {local_csv_path}")
-    print(f"Rows: {len(df)}")
+    print(f"Rows: {len(df)} ({storage_format}, {len(payload)} bytes)")
 
 
 if __name__ == "__main__":
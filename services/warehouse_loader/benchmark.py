@@ -0,0 +1,181 @@
+"""Benchmark raw-table load methods (to_sql vs. COPY csv/binary).
+
+``copy_csv`` streams a CSV file through ``copy_csv_stream`` behind a
+``HashingReader``, the same path the loader takes for S3 CSV objects; the file
+is written before the timer starts. ``copy_binary`` and ``to_sql`` load
+DataFrame chunks, as the loader does for Parquet/Arrow sources.
+
+Each run happens in a fresh process, so ``peak_rss_mb`` is the peak of that run
+alone; ``rss_delta_mb`` subtracts the process baseline measured before it.
+
+Run inside the warehouse_loader container, e.g.:
+
+    docker compose run --rm -e BENCH_ROWS=10000,1000000,10000000 \
+      warehouse_loader python benchmark.py
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from copy_load import copy_csv_stream, copy_frames
+from ingestions import HashingReader
+from loader import (
+    ident,
+    load_chunks_to_raw,
+    make_engine,
+    peak_rss_mb,
+    read_postgres_config,
+    truncate_raw_table,
+)
+
+BENCH_SCHEMA = "raw"
+BENCH_TABLE = "_bench_load"
+BENCH_METHODS = ("to_sql", "copy_csv", "copy_binary")
+
+
+def _parse_int_list(name: str, default: str) -> list[int]:
+    return [int(v) for v in os.getenv(name, default).split(",") if v.strip()]
+
+
+def synthetic_frames(n_rows: int, chunk_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    remaining = n_rows
+    while remaining > 0:
+        size = min(chunk_rows, remaining)
+        yield pd.DataFrame(
+            {
+                "f1": rng.random(size),
+                "f2": rng.random(size),
+                "f3": rng.random(size),
+                "f4": rng.random(size),
+                "target": rng.integers(0, 3, size, dtype=np.int32),
+            }
+        )
+        remaining -= size
+
+
+def write_synthetic_csv(path: Path, n_rows: int, chunk_rows: int) -> int:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, frame in enumerate(synthetic_frames(n_rows, chunk_rows)):
+            frame.to_csv(f, header=i == 0, index=False)
+    return path.stat().st_size
+
+
+def create_bench_table(engine) -> None:
+    schema = ident(BENCH_SCHEMA)
+    table = ident(BENCH_TABLE)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {schema}.{table} (
+                  f1 DOUBLE PRECISION NOT NULL,
+                  f2 DOUBLE PRECISION NOT NULL,
+                  f3 DOUBLE PRECISION NOT NULL,
+                  f4 DOUBLE PRECISION NOT NULL,
+                  target INTEGER NOT NULL
+                );
+                """
+            )
+        )
+
+
+def run_one(engine, method: str, n_rows: int, chunk_rows: int, csv_path: Path | None) -> dict:
+    truncate_raw_table(engine, schema=BENCH_SCHEMA, table=BENCH_TABLE)
+    frames = synthetic_frames(n_rows, chunk_rows)
+
+    baseline_rss_mb = peak_rss_mb()
+    started = time.perf_counter()
+    if method == "to_sql":
+        rows = load_chunks_to_raw(engine, frames, schema=BENCH_SCHEMA, table=BENCH_TABLE)
+    elif method == "copy_csv":
+        with open(csv_path, "rb") as raw:
+            rows = copy_csv_stream(engine, HashingReader(raw), BENCH_SCHEMA, BENCH_TABLE)
+    else:
+        rows = copy_frames(engine, frames, BENCH_SCHEMA, BENCH_TABLE, fmt="binary")
+    seconds = time.perf_counter() - started
+
+    return {
+        "method": method,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds) if seconds > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_delta_mb": round(peak_rss_mb() - baseline_rss_mb, 1),
+    }
+
+
+def run_isolated(method: str, n_rows: int, chunk_rows: int, csv_path: Path | None) -> dict:
+    """``run_one`` in a fresh process, so the peak RSS belongs to this run only."""
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return pool.submit(_run_in_child, method, n_rows, chunk_rows, csv_path).result()
+
+
+def _run_in_child(method: str, n_rows: int, chunk_rows: int, csv_path: Path | None) -> dict:
+    engine = make_engine(read_postgres_config())
+    try:
+        return run_one(engine, method, n_rows, chunk_rows, csv_path)
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    sizes = _parse_int_list("BENCH_ROWS", "10000,1000000,10000000")
+    chunk_rows = int(os.getenv("BENCH_CHUNK_ROWS", "100000"))
+    methods = [m.strip() for m in os.getenv("BENCH_METHODS", ",".join(BENCH_METHODS)).split(",")]
+    for method in methods:
+        if method not in BENCH_METHODS:
+            raise RuntimeError(f"Unknown benchmark method: {method!r}")
+    # to_sql takes hours at 10^7 rows; by default it only runs up to 10^6.
+    to_sql_max_rows = int(os.getenv("BENCH_TO_SQL_MAX_ROWS", "1000000"))
+
+    engine = make_engine(read_postgres_config())
+    create_bench_table(engine)
+
+    results = []
+    tmp_dir = tempfile.TemporaryDirectory(prefix="bench-load-")
+    try:
+        for n_rows in sizes:
+            csv_path = None
+            if "copy_csv" in methods:
+                csv_path = Path(tmp_dir.name) / f"bench_{n_rows}.csv"
+                csv_bytes = write_synthetic_csv(csv_path, n_rows, chunk_rows)
+                print(f"{'':>12} {n_rows:>10} rows: {csv_bytes / 1024**2:.1f} MiB CSV source")
+            for method in methods:
+                if method == "to_sql" and n_rows > to_sql_max_rows:
+                    print(f"{method:>12} {n_rows:>10} rows: skipped (BENCH_TO_SQL_MAX_ROWS)")
+                    continue
+                result = run_isolated(method, n_rows, chunk_rows, csv_path)
+                results.append(result)
+                print(
+                    f"{method:>12} {n_rows:>10} rows: {result['seconds']:>9.3f}s "
+                    f"{result['rows_per_sec']:>10} rows/s "
+                    f"peak RSS {result['peak_rss_mb']:.1f} MiB (+{result['rss_delta_mb']:.1f})"
+                )
+            if csv_path is not None:
+                csv_path.unlink()
+    finally:
+        tmp_dir.cleanup()
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_SCHEMA}.{BENCH_TABLE};"))
+
+    output_path = os.getenv("BENCH_OUTPUT")
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""PostgreSQL COPY FROM STDIN bulk-load engine for raw tables.
+
+Callers are expected to pass schema/table names that were already validated
+with ``loader.ident``; column names come from the data and are always quoted.
+"""
+
+import csv
+import io
+import struct
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.engine import Engine
+
+LOAD_METHODS = ("to_sql", "copy_csv", "copy_binary")
+
+_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_BINARY_TRAILER = struct.pack(">h", -1)
+
+# Fixed-width PostgreSQL types and their big-endian binary wire format.
+_FIXED_WIDTH_DTYPES = {
+    "float8": ">f8",
+    "float4": ">f4",
+    "int8": ">i8",
+    "int4": ">i4",
+    "int2": ">i2",
+    "bool": "?",
+}
+_TEXT_TYPES = {"text", "varchar", "bpchar"}
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_list(columns: Iterable[str]) -> str:
+    return ", ".join(quote_ident(c) for c in columns)
+
+
+class _PrefixedReader:
+    """File-like reader that replays already consumed bytes before the stream."""
+
+    def __init__(self, prefix: bytes, stream) -> None:
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if self._prefix:
+            if size is None or size < 0:
+                data, self._prefix = self._prefix + self._stream.read(), b""
+                return data
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        return self._stream.read(size)
+
+
+def split_csv_header(stream, probe_bytes: int = 64 * 1024) -> tuple[list[str], _PrefixedReader]:
+    """Read the CSV header line and return it with a reader positioned after it."""
+    buffered = b""
+    while b"\n" not in buffered:
+        block = stream.read(probe_bytes)
+        if not block:
+            break
+        buffered += block
+
+    header_line, sep, rest = buffered.partition(b"\n")
+    if not sep and not header_line:
+        raise RuntimeError("Source CSV is empty; expected a header row.")
+    columns = next(csv.reader([header_line.decode("utf-8").rstrip("\r")]))
+    return columns, _PrefixedReader(rest, stream)
+
+
+def fetch_column_types(cur, schema: str, table: str) -> dict[str, str]:
+    cur.execute(
+        """
+        SELECT a.attname, t.typname
+        FROM pg_attribute a
+        JOIN pg_type t ON t.oid = a.atttypid
+        WHERE a.attrelid = %s::regclass
+          AND a.attnum > 0
+          AND NOT a.attisdropped
+        """,
+        (f"{quote_ident(schema)}.{quote_ident(table)}",),
+    )
+    return {name: type_name for name, type_name in cur.fetchall()}
+
+
+def _copy_from(engine: Engine, sql: str, stream) -> int:
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(sql, stream)
+            rows = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return rows
+
+
+def copy_csv_stream(engine: Engine, stream, schema: str, table: str) -> int:
+    """COPY a CSV byte stream (with header row) straight into ``schema.table``.
+
+    The stream is never parsed client-side; psycopg2 forwards it to the server
+    in fixed-size blocks, so memory use does not depend on object size.
+    """
+    columns, body = split_csv_header(stream)
+    sql = (
+        f"COPY {quote_ident(schema)}.{quote_ident(table)} ({_column_list(columns)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    return _copy_from(engine, sql, body)
+
+
+def _encode_fixed_width(df: pd.DataFrame, pg_types: list[str]) -> bytes:
+    fields = [("n", ">i2")]
+    for i, pg_type in enumerate(pg_types):
+        dtype = np.dtype(_FIXED_WIDTH_DTYPES[pg_type])
+        fields += [(f"l{i}", ">i4"), (f"v{i}", dtype)]
+
+    out = np.empty(len(df), dtype=fields)
+    out["n"] = len(pg_types)
+    for i, (column, pg_type) in enumerate(zip(df.columns, pg_types)):
+        dtype = np.dtype(_FIXED_WIDTH_DTYPES[pg_type])
+        out[f"l{i}"] = dtype.itemsize
+        out[f"v{i}"] = df[column].to_numpy(dtype=dtype.newbyteorder("="))
+    return out.tobytes()
+
+
+def _encode_value(value, pg_type: str) -> bytes:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return struct.pack(">i", -1)
+    if pg_type in _TEXT_TYPES:
+        payload = str(value).encode("utf-8")
+    else:
+        payload = np.array(value, dtype=_FIXED_WIDTH_DTYPES[pg_type]).tobytes()
+    return struct.pack(">i", len(payload)) + payload
+
+
+def encode_binary_copy(df: pd.DataFrame, column_types: dict[str, str]) -> bytes:
+    """Encode ``df`` as a PostgreSQL binary COPY payload (without header/trailer).
+
+    Non-null fixed-width columns are packed in one vectorized step; frames with
+    nulls or text columns fall back to row-wise encoding.
+    """
+    try:
+        pg_types = [column_types[c] for c in df.columns]
+    except KeyError as e:
+        raise RuntimeError(f"Column {e} does not exist in the target table.") from e
+
+    unsupported = sorted(set(pg_types) - set(_FIXED_WIDTH_DTYPES) - _TEXT_TYPES)
+    if unsupported:
+        raise RuntimeError(f"Binary COPY does not support column types: {unsupported}")
+
+    if all(t in _FIXED_WIDTH_DTYPES for t in pg_types) and not df.isna().any().any():
+        return _encode_fixed_width(df, pg_types)
+
+    field_count = struct.pack(">h", len(pg_types))
+    parts: list[bytes] = []
+    for row in df.itertuples(index=False, name=None):
+        parts.append(field_count)
+        parts.extend(_encode_value(v, t) for v, t in zip(row, pg_types))
+    return b"".join(parts)
+
+
+def copy_frames(
+    engine: Engine, frames: Iterable[pd.DataFrame], schema: str, table: str, fmt: str = "csv"
+) -> int:
+    """COPY DataFrame chunks into ``schema.table`` within a single transaction.
+
+    Each chunk is serialized into an in-memory buffer (CSV or binary) and sent
+    with its own COPY statement, so only one encoded chunk is held at a time.
+    """
+    if fmt not in ("csv", "binary"):
+        raise ValueError(f"Unsupported COPY format: {fmt!r}")
+
+    target = f"{quote_ident(schema)}.{quote_ident(table)}"
+    rows = 0
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            column_types = fetch_column_types(cur, schema, table) if fmt == "binary" else {}
+            for df in frames:
+                if df.empty:
+                    continue
+                sql = f"COPY {target} ({_column_list(df.columns)}) FROM STDIN WITH (FORMAT {fmt})"
+                if fmt == "binary":
+                    payload = _BINARY_HEADER + encode_binary_copy(df, column_types) + _BINARY_TRAILER
+                    buffer = io.BytesIO(payload)
+                else:
+                    buffer = io.StringIO()
+                    df.to_csv(buffer, index=False, header=False)
+                    buffer.seek(0)
+                cur.copy_expert(sql, buffer)
+                rows += len(df)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return rows
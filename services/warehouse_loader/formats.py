@@ -0,0 +1,84 @@
+"""Columnar (Parquet / Arrow IPC) readers for lake objects.
+
+pyarrow is only needed when a contract uses ``storage.format: parquet`` or
+``arrow``, so it is imported lazily.
+"""
+
+from collections.abc import Iterator
+from urllib.parse import urlparse
+
+import pandas as pd
+
+STORAGE_FORMATS = ("csv", "parquet", "arrow")
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError(
+            "storage.format is parquet/arrow, but pyarrow is not installed in this environment."
+        ) from exc
+
+
+def make_arrow_filesystem(endpoint_url: str, access_key: str, secret_key: str):
+    """S3 filesystem with ranged reads, so only the needed row groups/columns are fetched."""
+    _require_pyarrow()
+    from pyarrow import fs
+
+    parsed = urlparse(endpoint_url)
+    return fs.S3FileSystem(
+        access_key=access_key,
+        secret_key=secret_key,
+        endpoint_override=parsed.netloc or parsed.path,
+        scheme=parsed.scheme or "https",
+        region="us-east-1",
+    )
+
+
+def _projection(available: list[str], columns: list[str] | None) -> list[str]:
+    if columns is None:
+        return available
+    projected = [c for c in available if c in columns]
+    if not projected:
+        raise RuntimeError(f"None of the target columns {columns} exist in the source {available}.")
+    return projected
+
+
+def read_parquet_frames(
+    filesystem, path: str, chunk_rows: int, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    import pyarrow.parquet as pq
+
+    with filesystem.open_input_file(path) as f:
+        parquet_file = pq.ParquetFile(f)
+        projection = _projection(parquet_file.schema_arrow.names, columns)
+        if chunk_rows <= 0:
+            yield parquet_file.read(columns=projection).to_pandas()
+            return
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=projection):
+            yield batch.to_pandas()
+
+
+def read_arrow_frames(
+    filesystem, path: str, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    import pyarrow.ipc as ipc
+
+    with filesystem.open_input_file(path) as f:
+        reader = ipc.open_file(f)
+        projection = _projection(reader.schema.names, columns)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).select(projection).to_pandas()
+
+
+def read_columnar_frames(
+    filesystem, fmt: str, bucket: str, key: str, chunk_rows: int, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    path = f"{bucket}/{key}"
+    if fmt == "parquet":
+        return read_parquet_frames(filesystem, path, chunk_rows, columns)
+    if fmt == "arrow":
+        return read_arrow_frames(filesystem, path, columns)
+    raise ValueError(f"Unsupported columnar format: {fmt!r}")
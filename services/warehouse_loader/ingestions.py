@@ -0,0 +1,256 @@
+"""Source object discovery and ``metadata.ingestions`` bookkeeping."""
+
+import fnmatch
+import hashlib
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+INCREMENTAL_MODES = ("off", "changed", "append")
+
+_GLOB_CHARS_RE = re.compile(r"[*?\[]")
+
+
+@dataclass(frozen=True)
+class SourceObject:
+    bucket: str
+    key: str
+    etag: str
+    size_bytes: int
+
+    @property
+    def uri(self) -> str:
+        return f"s3://{self.bucket}/{self.key}"
+
+
+@dataclass(frozen=True)
+class IngestionRecord:
+    etag: str
+    size_bytes: int
+    content_hash: str | None
+    row_count: int
+    watermark: float | None
+
+
+@dataclass(frozen=True)
+class ObjectLoad:
+    source: SourceObject
+    rows: int
+    content_hash: str | None
+    watermark: float | None
+
+
+class HashingReader:
+    """File-like wrapper that hashes every byte read from ``stream``."""
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self._hash.update(data)
+        return data
+
+    def close(self) -> None:
+        self._stream.close()
+
+    @property
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _normalize_etag(etag: str) -> str:
+    return etag.strip('"')
+
+
+def list_source_objects(s3, bucket: str, key: str) -> list[SourceObject]:
+    """Resolve a contract key to its source objects.
+
+    ``key`` is either a single object, a prefix ending in ``/`` (all objects
+    below it) or a glob such as ``name/v1/part-*.csv``.
+    """
+    glob_match = _GLOB_CHARS_RE.search(key)
+    if not key.endswith("/") and glob_match is None:
+        head = s3.head_object(Bucket=bucket, Key=key)
+        return [
+            SourceObject(
+                bucket=bucket,
+                key=key,
+                etag=_normalize_etag(head["ETag"]),
+                size_bytes=int(head["ContentLength"]),
+            )
+        ]
+
+    objects: list[SourceObject] = []
+    paginator = s3.get_paginator("list_objects_v2")
+    prefix = key[: glob_match.start()] if glob_match else key
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            if item["Key"].endswith("/") or int(item["Size"]) == 0:
+                continue
+            if glob_match and not fnmatch.fnmatchcase(item["Key"], key):
+                continue
+            objects.append(
+                SourceObject(
+                    bucket=bucket,
+                    key=item["Key"],
+                    etag=_normalize_etag(item["ETag"]),
+                    size_bytes=int(item["Size"]),
+                )
+            )
+    if not objects:
+        raise RuntimeError(f"No source objects found under s3://{bucket}/{key}")
+    return sorted(objects, key=lambda o: o.key)
+
+
+def fetch_ingestions(engine: Engine, name: str, version: str) -> dict[str, IngestionRecord]:
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                """
+                SELECT object_uri, etag, size_bytes, content_hash, row_count, watermark
+                FROM metadata.ingestions
+                WHERE dataset_name = :name AND dataset_version = :version;
+                """
+            ),
+            {"name": name, "version": version},
+        ).all()
+    return {
+        row.object_uri: IngestionRecord(
+            etag=row.etag,
+            size_bytes=int(row.size_bytes),
+            content_hash=row.content_hash,
+            row_count=int(row.row_count or 0),
+            watermark=row.watermark,
+        )
+        for row in rows
+    }
+
+
+def record_ingestions(
+    engine: Engine, name: str, version: str, loads: list[ObjectLoad], replace: bool = False
+) -> None:
+    """Upsert one row per loaded object; ``replace`` first forgets objects from earlier loads."""
+    with engine.begin() as conn:
+        if replace:
+            conn.execute(
+                text(
+                    """
+                    DELETE FROM metadata.ingestions
+                    WHERE dataset_name = :name AND dataset_version = :version;
+                    """
+                ),
+                {"name": name, "version": version},
+            )
+        if not loads:
+            return
+        conn.execute(
+            text(
+                """
+                INSERT INTO metadata.ingestions (
+                  dataset_name, dataset_version, object_uri,
+                  etag, size_bytes, content_hash, row_count, watermark
+                )
+                VALUES (
+                  :name, :version, :object_uri,
+                  :etag, :size_bytes, :content_hash, :row_count, :watermark
+                )
+                ON CONFLICT (dataset_name, dataset_version, object_uri)
+                DO UPDATE SET
+                  etag         = EXCLUDED.etag,
+                  size_bytes   = EXCLUDED.size_bytes,
+                  content_hash = EXCLUDED.content_hash,
+                  row_count    = EXCLUDED.row_count,
+                  watermark    = COALESCE(EXCLUDED.watermark, metadata.ingestions.watermark),
+                  loaded_at    = now();
+                """
+            ),
+            [
+                {
+                    "name": name,
+                    "version": version,
+                    "object_uri": load.source.uri,
+                    "etag": load.source.etag,
+                    "size_bytes": load.source.size_bytes,
+                    "content_hash": load.content_hash,
+                    "row_count": load.rows,
+                    "watermark": load.watermark,
+                }
+                for load in loads
+            ],
+        )
+
+
+def hash_object(s3, source: SourceObject, block_bytes: int = 8 * 1024 * 1024) -> str:
+    body = HashingReader(s3.get_object(Bucket=source.bucket, Key=source.key)["Body"])
+    try:
+        while body.read(block_bytes):
+            pass
+    finally:
+        body.close()
+    return body.hexdigest
+
+
+def split_unchanged(
+    s3, sources: list[SourceObject], previous: dict[str, IngestionRecord]
+) -> tuple[list[SourceObject], list[ObjectLoad]]:
+    """``(new or changed sources, re-uploaded but identical objects)``.
+
+    Matching ETag and size is enough to skip an object. When only the ETag moved
+    (a re-upload, e.g. with another multipart part size), the object is hashed and
+    skipped if the SHA-256 still matches; those come back as loads to record so
+    the next run does not hash them again.
+    """
+    changed: list[SourceObject] = []
+    retagged: list[ObjectLoad] = []
+    for source in sources:
+        record = previous.get(source.uri)
+        if record is None:
+            changed.append(source)
+        elif record.etag == source.etag and record.size_bytes == source.size_bytes:
+            continue
+        elif (
+            record.content_hash is not None
+            and record.size_bytes == source.size_bytes
+            and hash_object(s3, source) == record.content_hash
+        ):
+            retagged.append(
+                ObjectLoad(
+                    source=source,
+                    rows=record.row_count,
+                    content_hash=record.content_hash,
+                    watermark=record.watermark,
+                )
+            )
+        else:
+            changed.append(source)
+    return changed, retagged
+
+
+def append_watermarks(
+    pending: list[SourceObject],
+    previous: dict[str, IngestionRecord],
+    watermark_column: str | None,
+) -> dict[str, float]:
+    """Per-object watermarks for an append; objects not loaded before load in full.
+
+    A changed object that was loaded before is appended past its own watermark.
+    Without one there is no telling old rows from new, so this fails instead of
+    appending duplicates.
+    """
+    watermarks: dict[str, float] = {}
+    for source in pending:
+        record = previous.get(source.uri)
+        if record is None:
+            continue
+        if record.watermark is not None and watermark_column is not None:
+            watermarks[source.uri] = record.watermark
+        elif watermark_column is None or record.row_count:
+            raise RuntimeError(
+                f"{source.uri} changed since it was loaded and has no watermark to append from. "
+                "Set ingest.watermark_column or reload with INGEST_INCREMENTAL=changed."
+            )
+    return watermarks
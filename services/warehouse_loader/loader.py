@@ -1,15 +1,38 @@
-import io
 import os
 import re
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
 
 import boto3
 import pandas as pd
 import yaml
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine, URL
 
+from copy_load import LOAD_METHODS, copy_csv_stream, copy_frames
+from formats import COLUMNAR_FORMATS, STORAGE_FORMATS, make_arrow_filesystem, read_columnar_frames
+from ingestions import (
+    INCREMENTAL_MODES,
+    HashingReader,
+    ObjectLoad,
+    SourceObject,
+    append_watermarks,
+    fetch_ingestions,
+    list_source_objects,
+    record_ingestions,
+    split_unchanged,
+)
+try:
+    from stage_timing import StageTimer, peak_rss_mb
+except ModuleNotFoundError:
+    # Images copy stage_timing.py next to the service; local runs use services/common.
+    sys.path.append(str(Path(__file__).resolve().parent.parent / "common"))
+    from stage_timing import StageTimer, peak_rss_mb
+
 
 def env(name: str, default: str | None = None) -> str:
     v = os.getenv(name, default)
@@ -21,6 +44,8 @@ def env(name: str, default: str | None = None) -> str:
 # Strict SQL identifier validation (schema/table names)
 _IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
+LOAD_STRATEGIES = ("truncate", "swap")
+
 
 def ident(name: str) -> str:
     if not _IDENTIFIER_RE.match(name):
@@ -45,8 +70,15 @@ class DatasetContract:
     version: str
     storage_bucket: str
     storage_key: str
+    storage_format: str
     raw_schema: str
     raw_table: str
+    chunk_rows: int
+    load_method: str
+    load_strategy: str
+    incremental: str
+    watermark_column: str | None
+    parallelism: int
 
 
 @dataclass(frozen=True)
@@ -55,6 +87,7 @@ class DatasetConfig:
     key: str
     name: str
     version: str
+    format: str = "csv"
 
     @property
     def source_uri(self) -> str:
@@ -70,6 +103,19 @@ class PostgresConfig:
     port: str = "5432"
 
 
+@dataclass(frozen=True)
+class LoadStats:
+    rows: int
+    seconds: float
+    peak_rss_mb: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.rows / self.seconds
+
+
 def resolve_dataset_config_path() -> Path:
     explicit_path = os.getenv("DATASET_CONFIG_PATH")
     if explicit_path:
@@ -89,15 +135,25 @@ def load_dataset_contract(path: Path) -> DatasetContract:
         raise RuntimeError(f"Dataset config path is not a file: {path}")
 
     raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    ingest = raw.get("ingest") or {}
 
     try:
         dataset_name = str(raw["dataset_name"])
         version = str(raw["version"])
         storage_bucket = str(raw["storage"]["bucket"])
         storage_key = str(raw["storage"]["key"])
+        storage_format = str(raw["storage"].get("format", "csv"))
         raw_table_qualified = str(raw["warehouse"]["raw_table"])
+        chunk_rows = int(ingest.get("chunk_rows", 0))
+        load_method = str(ingest.get("load_method", "to_sql"))
+        load_strategy = str(ingest.get("load_strategy", "truncate"))
+        incremental = str(ingest.get("incremental", "off"))
+        watermark_column = ingest.get("watermark_column")
+        parallelism = int(ingest.get("parallelism", 1))
     except KeyError as e:
         raise RuntimeError(f"Missing key in dataset config {path}: {e}") from e
+    except (TypeError, ValueError) as e:
+        raise RuntimeError(f"Invalid ingest settings in dataset config {path}: {e}") from e
 
     raw_schema, raw_table = split_schema_table(raw_table_qualified)
     return DatasetContract(
@@ -105,8 +161,15 @@ def load_dataset_contract(path: Path) -> DatasetContract:
         version=version,
         storage_bucket=storage_bucket,
         storage_key=storage_key,
+        storage_format=storage_format,
         raw_schema=raw_schema,
         raw_table=raw_table,
+        chunk_rows=chunk_rows,
+        load_method=load_method,
+        load_strategy=load_strategy,
+        incremental=incremental,
+        watermark_column=str(watermark_column) if watermark_column else None,
+        parallelism=parallelism,
     )
 
 
@@ -120,13 +183,45 @@ def make_s3_client():
     )
 
 
-def read_csv_from_s3(s3, bucket: str, key: str) -> pd.DataFrame:
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    csv_bytes = obj["Body"].read()
-    return pd.read_csv(io.BytesIO(csv_bytes))
-
-
-def make_engine(pg: PostgresConfig) -> Engine:
+def read_csv_frames(stream, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield a CSV stream as DataFrames of at most ``chunk_rows`` rows.
+
+    The stream is handed to pandas as a file object, so only one chunk of raw
+    bytes and one parsed chunk are held in memory at any time. ``chunk_rows=0``
+    parses the whole stream into a single frame.
+    """
+    if chunk_rows <= 0:
+        yield pd.read_csv(stream)
+        return
+    with pd.read_csv(stream, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+class WatermarkFilter:
+    """Drop rows whose ``column`` is not past ``after`` and track the max seen."""
+
+    def __init__(self, frames: Iterable[pd.DataFrame], column: str, after: float | None) -> None:
+        self._frames = frames
+        self.column = column
+        self.after = after
+        self.max_seen: float | None = None
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for df in self._frames:
+            if self.column not in df.columns:
+                raise RuntimeError(f"Watermark column {self.column!r} not in source columns.")
+            values = pd.to_numeric(df[self.column])
+            if self.after is not None:
+                keep = values > self.after
+                df, values = df[keep], values[keep]
+            if len(values):
+                chunk_max = float(values.max())
+                if self.max_seen is None or chunk_max > self.max_seen:
+                    self.max_seen = chunk_max
+            yield df
+
+
+def make_engine(pg: PostgresConfig, pool_size: int = 5) -> Engine:
     url = URL.create(
         drivername="postgresql+psycopg2",
         username=pg.user,
@@ -135,7 +230,7 @@ def make_engine(pg: PostgresConfig) -> Engine:
         port=int(pg.port),
         database=pg.db,
     )
-    return create_engine(url)
+    return create_engine(url, pool_size=pool_size)
 
 
 def truncate_raw_table(engine: Engine, schema: str, table: str) -> None:
@@ -145,23 +240,208 @@ def truncate_raw_table(engine: Engine, schema: str, table: str) -> None:
         conn.execute(text(f"TRUNCATE TABLE {schema}.{table};"))
 
 
-def load_dataframe_to_raw(engine: Engine, df: pd.DataFrame, schema: str, table: str) -> None:
+def create_shadow_table(engine: Engine, schema: str, table: str) -> str:
+    """Create an empty UNLOGGED copy of ``schema.table`` and return its name.
+
+    Rows loaded into an unlogged table skip WAL, so a failed reload leaves no
+    WAL behind for data that is discarded anyway.
+    """
+    schema = ident(schema)
+    table = ident(table)
+    shadow = ident(f"{table}__shadow")
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {schema}.{shadow};"))
+        conn.execute(
+            text(f"CREATE UNLOGGED TABLE {schema}.{shadow} (LIKE {schema}.{table} INCLUDING ALL);")
+        )
+    return shadow
+
+
+def drop_table_if_exists(engine: Engine, schema: str, table: str) -> None:
+    schema = ident(schema)
+    table = ident(table)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {schema}.{table};"))
+
+
+def swap_in_shadow_table(
+    engine: Engine, schema: str, table: str, shadow: str, lock_timeout: str = "10s"
+) -> None:
+    """Atomically replace ``schema.table`` with the loaded shadow table.
+
+    SET LOGGED only locks the shadow table; the live table is locked for the
+    two renames and the drop, which are catalog-only operations. Readers block
+    for that instant and then see the new rows, never an empty table.
+    """
+    schema = ident(schema)
+    table = ident(table)
+    shadow = ident(shadow)
+    old = ident(f"{table}__old")
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {schema}.{shadow} SET LOGGED;"))
+        conn.execute(
+            text("SELECT set_config('lock_timeout', :timeout, true);"),
+            {"timeout": lock_timeout},
+        )
+        conn.execute(text(f"DROP TABLE IF EXISTS {schema}.{old};"))
+        conn.execute(text(f"ALTER TABLE {schema}.{table} RENAME TO {old};"))
+        conn.execute(text(f"ALTER TABLE {schema}.{shadow} RENAME TO {table};"))
+        conn.execute(text(f"DROP TABLE {schema}.{old};"))
+
+
+def load_chunks_to_raw(
+    engine: Engine, chunks: Iterable[pd.DataFrame], schema: str, table: str
+) -> int:
     schema = ident(schema)
     table = ident(table)
-    df.to_sql(table, engine, schema=schema, if_exists="append", index=False)
 
+    rows = 0
+    with engine.begin() as conn:
+        for chunk in chunks:
+            chunk.to_sql(table, conn, schema=schema, if_exists="append", index=False)
+            rows += len(chunk)
+    return rows
+
+
+def _load_frames(
+    engine: Engine, frames: Iterable[pd.DataFrame], schema: str, table: str, load_method: str
+) -> int:
+    if load_method == "to_sql":
+        return load_chunks_to_raw(engine, frames, schema=schema, table=table)
+    fmt = "binary" if load_method == "copy_binary" else "csv"
+    return copy_frames(engine, frames, schema, table, fmt=fmt)
+
+
+def load_object(
+    s3,
+    engine: Engine,
+    source: SourceObject,
+    schema: str,
+    table: str,
+    chunk_rows: int,
+    load_method: str,
+    watermark_column: str | None = None,
+    watermark_after: float | None = None,
+    storage_format: str = "csv",
+    filesystem=None,
+    columns: list[str] | None = None,
+) -> ObjectLoad:
+    """Load one source object into ``schema.table``.
+
+    CSV objects are hashed while they stream through. Parquet/Arrow objects are
+    read with ranged requests via ``filesystem`` and projected to ``columns``,
+    so they are never read in full and get no content hash.
+    """
+    schema = ident(schema)
+    table = ident(table)
+
+    if storage_format in COLUMNAR_FORMATS:
+        frames: Iterable[pd.DataFrame] = read_columnar_frames(
+            filesystem, storage_format, source.bucket, source.key, chunk_rows, columns
+        )
+        watermark = None
+        if watermark_column is not None:
+            watermark = WatermarkFilter(frames, watermark_column, watermark_after)
+            frames = watermark
+        rows = _load_frames(engine, frames, schema, table, load_method)
+        return ObjectLoad(
+            source=source,
+            rows=rows,
+            content_hash=None,
+            watermark=watermark.max_seen if watermark is not None else None,
+        )
+
+    body = HashingReader(s3.get_object(Bucket=source.bucket, Key=source.key)["Body"])
+    try:
+        if load_method == "copy_csv" and watermark_column is None:
+            rows = copy_csv_stream(engine, body, schema, table)
+            return ObjectLoad(source=source, rows=rows, content_hash=body.hexdigest, watermark=None)
+
+        frames = read_csv_frames(body, chunk_rows)
+        watermark = None
+        if watermark_column is not None:
+            watermark = WatermarkFilter(frames, watermark_column, watermark_after)
+            frames = watermark
+        rows = _load_frames(engine, frames, schema, table, load_method)
+    finally:
+        body.close()
+
+    return ObjectLoad(
+        source=source,
+        rows=rows,
+        content_hash=body.hexdigest,
+        watermark=watermark.max_seen if watermark is not None else None,
+    )
 
-def upsert_dataset_metadata(engine: Engine, cfg: DatasetConfig, row_count: int) -> None:
+
+def fetch_table_columns(engine: Engine, schema: str, table: str) -> list[str]:
+    return [c["name"] for c in inspect(engine).get_columns(ident(table), schema=ident(schema))]
+
+
+def load_objects(
+    s3,
+    engine: Engine,
+    sources: list[SourceObject],
+    loads: list[ObjectLoad],
+    parallelism: int,
+    watermarks_after: dict[str, float] | None = None,
+    **load_kwargs,
+) -> None:
+    """Load ``sources`` with up to ``parallelism`` concurrent fetch/parse/COPY workers.
+
+    Completed loads are appended to ``loads`` even when a later object fails, so
+    callers can still record them. Threads suffice: workers spend their time in
+    S3 reads, the pandas C parser and COPY round-trips, which release the GIL.
+    ``watermarks_after`` maps object URIs to the watermark to resume past.
+    """
+    watermarks_after = watermarks_after or {}
+
+    def load(source: SourceObject) -> ObjectLoad:
+        watermark_after = watermarks_after.get(source.uri)
+        return load_object(s3, engine, source, watermark_after=watermark_after, **load_kwargs)
+
+    if parallelism <= 1 or len(sources) <= 1:
+        for source in sources:
+            loads.append(load(source))
+        return
+
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="loader") as pool:
+        futures = [pool.submit(load, source) for source in sources]
+        _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        # Stop queued objects on the first failure; running workers finish on pool exit.
+        for future in not_done:
+            future.cancel()
+
+    errors = []
+    for future in futures:
+        if future.cancelled():
+            continue
+        if future.exception() is not None:
+            errors.append(future.exception())
+        else:
+            loads.append(future.result())
+    loads.sort(key=lambda load: load.source.key)
+    if errors:
+        raise errors[0]
+
+
+def upsert_dataset_metadata(
+    engine: Engine, cfg: DatasetConfig, row_count: int, append: bool = False
+) -> None:
+    # Appends add to the recorded row count instead of replacing it.
+    row_count_expr = (
+        "metadata.datasets.row_count + EXCLUDED.row_count" if append else "EXCLUDED.row_count"
+    )
     with engine.begin() as conn:
         conn.execute(
             text(
-                """
+                f"""
                 INSERT INTO metadata.datasets (name, version, source_uri, row_count)
                 VALUES (:name, :version, :source_uri, :row_count)
                 ON CONFLICT (name, version)
                 DO UPDATE SET
                   source_uri = EXCLUDED.source_uri,
-                  row_count  = EXCLUDED.row_count,
+                  row_count  = {row_count_expr},
                   loaded_at  = now();
                 """
             ),
@@ -180,6 +460,7 @@ def read_dataset_config(contract: DatasetContract) -> DatasetConfig:
         key=os.getenv("DATASET_KEY", contract.storage_key),
         name=os.getenv("DATASET_NAME", contract.dataset_name),
         version=os.getenv("DATASET_VERSION", contract.version),
+        format=os.getenv("DATASET_FORMAT", contract.storage_format),
     )
 
 
@@ -193,6 +474,55 @@ def read_postgres_config() -> PostgresConfig:
     )
 
 
+def read_chunk_rows(contract: DatasetContract) -> int:
+    chunk_rows = int(os.getenv("LOAD_CHUNK_ROWS", str(contract.chunk_rows)))
+    if chunk_rows < 0:
+        raise RuntimeError(f"LOAD_CHUNK_ROWS must be >= 0, got: {chunk_rows}")
+    return chunk_rows
+
+
+def read_load_method(contract: DatasetContract) -> str:
+    load_method = os.getenv("LOAD_METHOD", contract.load_method)
+    if load_method not in LOAD_METHODS:
+        raise RuntimeError(
+            f"Invalid load method {load_method!r}. Use one of: {', '.join(LOAD_METHODS)}."
+        )
+    return load_method
+
+
+def read_load_strategy(contract: DatasetContract) -> str:
+    load_strategy = os.getenv("LOAD_STRATEGY", contract.load_strategy)
+    if load_strategy not in LOAD_STRATEGIES:
+        raise RuntimeError(
+            f"Invalid load strategy {load_strategy!r}. Use one of: {', '.join(LOAD_STRATEGIES)}."
+        )
+    return load_strategy
+
+
+def read_incremental_mode(contract: DatasetContract) -> str:
+    incremental = os.getenv("INGEST_INCREMENTAL", contract.incremental)
+    if incremental not in INCREMENTAL_MODES:
+        raise RuntimeError(
+            f"Invalid incremental mode {incremental!r}. Use one of: {', '.join(INCREMENTAL_MODES)}."
+        )
+    return incremental
+
+
+def read_parallelism(contract: DatasetContract) -> int:
+    parallelism = int(os.getenv("LOAD_PARALLELISM", str(contract.parallelism)))
+    if parallelism < 1:
+        raise RuntimeError(f"LOAD_PARALLELISM must be >= 1, got: {parallelism}")
+    return parallelism
+
+
+def read_storage_format(ds: DatasetConfig) -> str:
+    if ds.format not in STORAGE_FORMATS:
+        raise RuntimeError(
+            f"Invalid storage format {ds.format!r}. Use one of: {', '.join(STORAGE_FORMATS)}."
+        )
+    return ds.format
+
+
 def read_raw_target(contract: DatasetContract) -> tuple[str, str]:
     raw_schema = env("RAW_SCHEMA", contract.raw_schema)
     raw_table = env("RAW_TABLE", contract.raw_table)
@@ -205,17 +535,155 @@ def main() -> None:
     ds = read_dataset_config(contract)
     pg = read_postgres_config()
     raw_schema, raw_table = read_raw_target(contract)
+    chunk_rows = read_chunk_rows(contract)
+    load_method = read_load_method(contract)
+    load_strategy = read_load_strategy(contract)
+    incremental = read_incremental_mode(contract)
+    parallelism = read_parallelism(contract)
+    storage_format = read_storage_format(ds)
 
     s3 = make_s3_client()
-    df = read_csv_from_s3(s3, ds.bucket, ds.key)
+    engine = make_engine(pg, pool_size=parallelism)
+    timer = StageTimer.from_env("warehouse_loader")
+    try:
+        _ingest(
+            timer,
+            s3,
+            engine,
+            contract,
+            ds,
+            contract_path=contract_path,
+            raw_schema=raw_schema,
+            raw_table=raw_table,
+            chunk_rows=chunk_rows,
+            load_method=load_method,
+            load_strategy=load_strategy,
+            incremental=incremental,
+            parallelism=parallelism,
+            storage_format=storage_format,
+        )
+    finally:
+        timer.write_to_postgres(
+            engine,
+            labels={
+                "dataset_name": ds.name,
+                "dataset_version": ds.version,
+                "load_method": load_method,
+                "storage_format": storage_format,
+            },
+        )
 
-    engine = make_engine(pg)
-    truncate_raw_table(engine, schema=raw_schema, table=raw_table)
-    load_dataframe_to_raw(engine, df, schema=raw_schema, table=raw_table)
-    upsert_dataset_metadata(engine, ds, row_count=len(df))
+
+def _ingest(
+    timer: StageTimer,
+    s3,
+    engine: Engine,
+    contract: DatasetContract,
+    ds: DatasetConfig,
+    *,
+    contract_path: Path,
+    raw_schema: str,
+    raw_table: str,
+    chunk_rows: int,
+    load_method: str,
+    load_strategy: str,
+    incremental: str,
+    parallelism: int,
+    storage_format: str,
+) -> None:
+    filesystem = None
+    columns = None
+    if storage_format in COLUMNAR_FORMATS:
+        filesystem = make_arrow_filesystem(
+            env("STORAGE_ENDPOINT_URL"), env("MINIO_ROOT_USER"), env("MINIO_ROOT_PASSWORD")
+        )
+        columns = fetch_table_columns(engine, schema=raw_schema, table=raw_table)
 
     print(f"Dataset config: {contract_path}")
-    print(f"Loaded {len(df)} rows into {raw_schema}.{raw_table}")
+    with timer.stage("list_source_objects") as stage:
+        sources = list_source_objects(s3, ds.bucket, ds.key)
+        previous = fetch_ingestions(engine, ds.name, ds.version) if incremental != "off" else {}
+        stage.rows = len(sources)
+
+    append = incremental == "append"
+    watermark_column = contract.watermark_column if append else None
+    changed, retagged = split_unchanged(s3, sources, previous) if previous else (sources, [])
+    watermarks_after: dict[str, float] = {}
+    if append:
+        # New part-files load in full; a changed (growing) object only past its own
+        # watermark, and without one the run fails rather than duplicating rows.
+        pending = changed
+        watermarks_after = append_watermarks(pending, previous, watermark_column)
+    elif incremental == "changed" and not changed and set(previous) == {s.uri for s in sources}:
+        pending = []
+    else:
+        pending = sources
+
+    if retagged and (append or not pending):
+        record_ingestions(engine, ds.name, ds.version, retagged)
+    if not pending:
+        print(f"No changes in {ds.source_uri} since the last ingestion; skipping load.")
+        return
+
+    with timer.stage("prepare_target"):
+        if append:
+            target_table = raw_table
+        elif load_strategy == "swap":
+            target_table = create_shadow_table(engine, schema=raw_schema, table=raw_table)
+        else:
+            truncate_raw_table(engine, schema=raw_schema, table=raw_table)
+            target_table = raw_table
+
+    started = time.perf_counter()
+    loads: list[ObjectLoad] = []
+    with timer.stage("load_objects") as stage:
+        try:
+            load_objects(
+                s3,
+                engine,
+                pending,
+                loads,
+                parallelism=parallelism,
+                schema=raw_schema,
+                table=target_table,
+                chunk_rows=chunk_rows,
+                load_method=load_method,
+                watermark_column=watermark_column,
+                watermarks_after=watermarks_after,
+                storage_format=storage_format,
+                filesystem=filesystem,
+                columns=columns,
+            )
+        except Exception:
+            if not append and load_strategy == "swap":
+                drop_table_if_exists(engine, schema=raw_schema, table=target_table)
+            elif append:
+                record_ingestions(engine, ds.name, ds.version, loads)
+            raise
+        stage.rows = sum(load.rows for load in loads)
+
+    if not append and load_strategy == "swap":
+        with timer.stage("swap_in_shadow_table"):
+            swap_in_shadow_table(engine, schema=raw_schema, table=raw_table, shadow=target_table)
+
+    stats = LoadStats(
+        rows=sum(load.rows for load in loads),
+        seconds=time.perf_counter() - started,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    with timer.stage("record_metadata"):
+        record_ingestions(engine, ds.name, ds.version, loads, replace=not append)
+        upsert_dataset_metadata(engine, ds, row_count=stats.rows, append=append)
+
+    print(
+        f"Loaded {stats.rows} rows from {len(loads)}/{len(sources)} {storage_format} object(s)"
+        f" ({sum(load.source.size_bytes for load in loads)} bytes) into {raw_schema}.{raw_table}"
+    )
+    print(
+        f"Load method: {load_method}, strategy: {'append' if append else load_strategy}"
+        f", parallelism: {parallelism}"
+        f" | {stats.rows_per_sec:.0f} rows/s | peak RSS {stats.peak_rss_mb:.1f} MiB"
+    )
     print(f"Upserted metadata for {ds.name}:{ds.version} ({ds.source_uri})")
 
 
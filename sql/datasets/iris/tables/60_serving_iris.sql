@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS serving.iris_predictions (
+  row_id BIGINT NOT NULL,
+  model_name TEXT NOT NULL,
+  model_version TEXT NOT NULL,
+  prediction INT NOT NULL,
+  probabilities DOUBLE PRECISION[],
+  scored_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (model_name, model_version, row_id)
+);
@@ -8,3 +8,16 @@ CREATE TABLE IF NOT EXISTS metadata.datasets (
     UNIQUE (name, version)
 );
 
+CREATE TABLE IF NOT EXISTS metadata.ingestions (
+    id BIGSERIAL PRIMARY KEY,
+    dataset_name TEXT NOT NULL,
+    dataset_version TEXT NOT NULL,
+    object_uri TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    content_hash TEXT,
+    row_count BIGINT,
+    watermark DOUBLE PRECISION,
+    loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+    UNIQUE (dataset_name, dataset_version, object_uri)
+);
@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS mlops.stage_timings (
+    id BIGSERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    job TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    wall_seconds DOUBLE PRECISION NOT NULL,
+    cpu_seconds DOUBLE PRECISION NOT NULL,
+    peak_rss_mb DOUBLE PRECISION NOT NULL,
+    row_count BIGINT,
+    error TEXT,
+    labels JSONB NOT NULL DEFAULT '{}'::jsonb,
+    recorded_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS stage_timings_job_stage_idx
+    ON mlops.stage_timings (job, stage, started_at);